@@ -0,0 +1,196 @@
+"""
+Bulk archiving of a channel's message history to the Synology NAS.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import discord
+from discord.ext import commands
+
+from backfill import HistoryCrawler
+from reactions import STATUS_QUEUED, STATUS_REPOST, STATUS_SPOOLED
+
+logger = logging.getLogger(__name__)
+
+
+def parse_since(value: Optional[str]) -> Optional[int]:
+    """
+    Parse an archive start point.
+
+    Args:
+        value: A message ID or an ISO date such as 2024-01-31
+
+    Returns:
+        A snowflake to archive after, or None to start at the beginning
+    """
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    when = datetime.fromisoformat(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return discord.utils.time_snowflake(when)
+
+
+class ArchiveStats:
+    """Progress counters for one archive run."""
+
+    def __init__(self, start_id: int):
+        self.start_id = start_id
+        self.started = time.monotonic()
+        self.messages = 0
+        self.urls = 0
+        self.failed = 0
+        self.last_id = start_id
+
+    def summary(self) -> str:
+        """Return a one-line progress summary with throughput and ETA."""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        # Messages are crawled oldest first, so snowflake time measures progress
+        start_time = discord.utils.snowflake_time(self.start_id).timestamp()
+        last_time = discord.utils.snowflake_time(self.last_id).timestamp()
+        span = time.time() - start_time
+        progress = min(max((last_time - start_time) / span, 0.0), 1.0) if span > 0 else 1.0
+        eta = elapsed * (1 - progress) / progress if progress > 0 else float("inf")
+        eta_text = f"{eta:.0f}s" if eta != float("inf") else "unknown"
+        return (f"{self.messages} message(s), {self.urls} URL(s), {self.failed} failed | "
+                f"{self.messages / elapsed:.1f} msg/s, {self.urls / elapsed:.1f} URL/s | "
+                f"{progress:.1%} done, ETA {eta_text}")
+
+
+class ChannelArchiver:
+    """
+    Archives the media of a channel's entire history.
+
+    Messages are streamed page by page through the bot's extractor and the
+    batched NAS submitter. At most ``max_pending`` messages are in flight at
+    once, so memory stays constant regardless of channel size. The crawl
+    position is saved as a resumable cursor in the state database.
+    """
+
+    def __init__(self, bot: Any, max_pending: int = 50, report_interval: float = 10.0,
+                 checkpoint_every: int = 100):
+        """
+        Initialize the archiver.
+
+        Args:
+            bot: The DiscordShowcaseLoader providing extraction, submission and state
+            max_pending: Maximum number of messages being submitted at once
+            report_interval: Seconds between progress log lines
+            checkpoint_every: Messages between saved cursors
+        """
+        self.bot = bot
+        self.max_pending = max_pending
+        self.report_interval = report_interval
+        self.checkpoint_every = checkpoint_every
+
+    async def archive(self, channel: discord.abc.GuildChannel, since: Optional[int] = None) -> ArchiveStats:
+        """
+        Archive a channel's media, resuming a previous run if one was interrupted.
+
+        Args:
+            channel: Channel to archive
+            since: Only archive messages after this snowflake (default: whole channel)
+
+        Returns:
+            Final statistics of the run
+        """
+        start_id = since or channel.id
+        cursor = await self.bot.state.get_archive_cursor(channel.id, start_id)
+        if cursor:
+            logger.info(f"Resuming archive of #{channel.name} after message {cursor}")
+
+        stats = ArchiveStats(start_id)
+        slots = asyncio.Semaphore(self.max_pending)
+        pending = set()
+
+        def done(task: asyncio.Task):
+            pending.discard(task)
+            slots.release()
+
+        async def handle(message: discord.Message):
+            await slots.acquire()
+            task = asyncio.create_task(self._archive_message(message, stats))
+            pending.add(task)
+            task.add_done_callback(done)
+            stats.last_id = message.id
+
+        async def checkpoint(channel_id: int, message_id: int):
+            # Only messages that were fully submitted may be skipped on resume
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            await self.bot.state.flush()
+            await self.bot.state.save_archive_cursor(channel_id, start_id, message_id)
+
+        crawler = HistoryCrawler(handle, checkpoint, checkpoint_every=self.checkpoint_every)
+        reporter = asyncio.create_task(self._report(channel, stats))
+        try:
+            await crawler.crawl(channel, after=cursor or since)
+        finally:
+            reporter.cancel()
+
+        await self.bot.state.clear_archive_cursor(channel.id)
+        logger.info(f"Archive of #{channel.name} complete: {stats.summary()}")
+        return stats
+
+    async def _archive_message(self, message: discord.Message, stats: ArchiveStats):
+        """Submit the media of one archived message."""
+        stats.messages += 1
+        if message.author == self.bot.user:
+            return
+
+        if await self.bot.state.is_message_processed(message.id):
+            return
+
+        media_urls = self.bot._extract_media_urls(message)
+        if not media_urls:
+            return
+
+        results = await asyncio.gather(
+            *(self.bot._download_media(media, react=False)
+              for media in self.bot._build_media_jobs(message, media_urls)),
+            return_exceptions=True
+        )
+        failed = sum(1 for result in results
+                     if result not in (STATUS_QUEUED, STATUS_SPOOLED, STATUS_REPOST))
+        stats.urls += len(media_urls)
+        stats.failed += failed
+
+        # A message with a failed URL stays unprocessed so a later run retries it;
+        # its URLs that did get through are then skipped as reposts
+        if not failed:
+            self.bot.processed_messages.mark_processed(message.channel.id, message.id)
+            self.bot.state.record_message(message.channel.id, message.id)
+
+    async def _report(self, channel: discord.abc.GuildChannel, stats: ArchiveStats):
+        """Log progress periodically."""
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(f"Archiving #{channel.name}: {stats.summary()}")
+
+
+class ArchiveCommands(commands.Cog):
+    """Bot commands for archiving channel history."""
+
+    def __init__(self, bot: Any):
+        self.bot = bot
+        self.archiver = ChannelArchiver(bot)
+
+    @commands.command(name="archive")
+    @commands.has_permissions(manage_messages=True)
+    async def archive(self, ctx: commands.Context, channel: discord.TextChannel,
+                      since: Optional[str] = None):
+        """Archive all media in a channel: !archive #channel [YYYY-MM-DD|message-id]"""
+        try:
+            since_id = parse_since(since)
+        except ValueError:
+            await ctx.send(f"❌ Invalid start point: {since}")
+            return
+
+        await ctx.send(f"📥 Archiving #{channel.name}...")
+        stats = await self.archiver.archive(channel, since_id)
+        await ctx.send(f"✅ Archived #{channel.name}: {stats.summary()}")
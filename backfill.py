@@ -0,0 +1,70 @@
+"""
+Channel history crawling for catching up on messages posted while offline.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryCrawler:
+    """
+    Streams a channel's message history, oldest first, into a handler.
+
+    History is fetched through discord.py, which pages 100 messages per
+    request and waits on the per-route rate-limit buckets. Every
+    ``checkpoint_every`` messages the crawler reports the newest message it
+    has handed off, so an interrupted crawl can resume from that point.
+    """
+
+    def __init__(self, handler: Callable[[discord.Message], Awaitable[Any]],
+                 checkpoint: Callable[[int, int], Awaitable[None]],
+                 checkpoint_every: int = 100):
+        """
+        Initialize the crawler.
+
+        Args:
+            handler: Coroutine function called for every message
+            checkpoint: Coroutine function called with (channel_id, message_id)
+            checkpoint_every: Number of messages between checkpoints
+        """
+        self.handler = handler
+        self.checkpoint = checkpoint
+        self.checkpoint_every = max(1, checkpoint_every)
+
+    async def crawl(self, channel: discord.abc.Messageable, after: Optional[int] = None,
+                    before: Optional[int] = None) -> int:
+        """
+        Crawl a channel's history.
+
+        Args:
+            channel: Channel to read
+            after: Only read messages newer than this message ID
+            before: Only read messages older than this message ID
+
+        Returns:
+            Number of messages handed to the handler
+        """
+        count = 0
+        last_id = None
+        history = channel.history(
+            limit=None,
+            after=discord.Object(id=after) if after else None,
+            before=discord.Object(id=before) if before else None,
+            oldest_first=True
+        )
+
+        try:
+            async for message in history:
+                await self.handler(message)
+                count += 1
+                last_id = message.id
+                if count % self.checkpoint_every == 0:
+                    await self.checkpoint(channel.id, last_id)
+        finally:
+            if last_id is not None:
+                await self.checkpoint(channel.id, last_id)
+
+        return count
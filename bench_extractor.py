@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for media URL extraction.
+
+Compares the single-pass extractor in media_extractor.py against the previous
+per-pattern implementation on a corpus of realistic and adversarial
+4000-character messages (Discord's message length limit).
+
+Usage:
+    python bench_extractor.py [--iterations N] [--max-us MICROSECONDS] [--extra-resolvers N]
+
+With --max-us the script exits with status 1 if any corpus takes longer than
+the given number of microseconds per message, so it can guard against
+regressions. With --extra-resolvers the registry is filled with that many
+additional site resolvers first, to show that extraction does not slow down
+as sites are added.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from media_extractor import MEDIA_EXTENSIONS, Resolver, extract_urls, register_resolver
+
+MESSAGE_LENGTH = 4000
+
+LEGACY_URL_PATTERNS = [
+    r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+',
+    r'https?://(?:www\.)?vimeo\.com/\d+',
+    r'https?://(?:www\.)?twitch\.tv/\w+',
+    r'https?://(?:i\.)?imgur\.com/\w+\.(?:jpg|jpeg|png|gif|webp)',
+    r'https?://(?:www\.)?reddit\.com/\w+',
+    r'https?://(?:cdn\.)?discordapp\.com/attachments/[\w/.-]+',
+    r'https?://media\.discordapp\.net/attachments/[\w/.-]+',
+]
+
+
+def legacy_extract_urls(content: str) -> list:
+    """The extractor as it was before media_extractor.py, for comparison."""
+    media_urls = []
+    for pattern in LEGACY_URL_PATTERNS:
+        media_urls.extend(re.findall(pattern, content, re.IGNORECASE))
+    url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+\.(?:' + '|'.join(
+        ext.lstrip('.') for exts in MEDIA_EXTENSIONS.values() for ext in exts
+    ) + r')'
+    media_urls.extend(re.findall(url_pattern, content, re.IGNORECASE))
+    return list(dict.fromkeys(media_urls))
+
+
+WORDS = ("check out this new build it turned out great what do you think about "
+         "the lighting colors composition render took hours lol nice gg").split()
+
+SAMPLE_URLS = [
+    "https://cdn.discordapp.com/attachments/1090000000000000000/1100000000000000000/render_final.png",
+    "https://media.discordapp.net/attachments/1090000000000000000/1100000000000000001/clip.mp4",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://vimeo.com/123456789",
+    "https://www.twitch.tv/somestreamer",
+    "https://i.imgur.com/AbCdEf1.jpg",
+    "https://www.reddit.com/r/pics/comments/abc123/title/",
+    "https://example.com/gallery/photo_001.jpeg?size=large",
+    "https://github.com/RAMOTS/discord-showcase-loader",
+    "https://docs.python.org/3/library/re.html",
+]
+
+
+def _fill(rng: random.Random, parts: list) -> str:
+    """Pad a list of parts with words up to MESSAGE_LENGTH characters."""
+    text = " ".join(parts)
+    while len(text) < MESSAGE_LENGTH:
+        text += " " + rng.choice(WORDS)
+    return text[:MESSAGE_LENGTH]
+
+
+def build_corpus(seed: int = 1234) -> dict:
+    """Build named lists of 4000-character benchmark messages."""
+    rng = random.Random(seed)
+    corpus = {}
+
+    corpus["plain_text"] = [_fill(rng, []) for _ in range(50)]
+
+    corpus["realistic_mixed"] = [
+        _fill(rng, [rng.choice(WORDS) if rng.random() < 0.85 else rng.choice(SAMPLE_URLS)
+                    for _ in range(400)])
+        for _ in range(50)
+    ]
+
+    corpus["url_dense"] = [
+        _fill(rng, [rng.choice(SAMPLE_URLS) for _ in range(80)]) for _ in range(50)
+    ]
+
+    # One huge token with no media extension forces the legacy direct-media
+    # pattern to backtrack across the whole message
+    corpus["adversarial_long_token"] = [
+        "https://example.com/" + "a" * (MESSAGE_LENGTH - 20) for _ in range(20)
+    ]
+
+    # Many scheme prefixes in a single token
+    corpus["adversarial_scheme_repeat"] = [
+        ("http://" * (MESSAGE_LENGTH // 7))[:MESSAGE_LENGTH] for _ in range(20)
+    ]
+
+    # Dots everywhere and near-miss extensions
+    corpus["adversarial_near_miss"] = [
+        ("https://x.y/" + ".jp.pn.mp.we.gi" * 300)[:MESSAGE_LENGTH] for _ in range(20)
+    ]
+
+    return corpus
+
+
+def bench(func, messages: list, iterations: int) -> float:
+    """Return the mean time per message in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in messages:
+            func(message)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(messages)) * 1e6
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark media URL extraction")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="passes over each corpus (default: 20)")
+    parser.add_argument("--max-us", type=float, default=None,
+                        help="fail if the new extractor exceeds this many microseconds per message")
+    parser.add_argument("--extra-resolvers", type=int, default=0,
+                        help="register this many additional site resolvers first (default: 0)")
+    args = parser.parse_args()
+
+    for index in range(args.extra_resolvers):
+        register_resolver(Resolver(f'site{index}', [f'site{index}.example'],
+                                   rf'https?://(?:www\.)?site{index}\.example/media/\w+'))
+
+    corpus = build_corpus()
+    failed = False
+
+    print("Media URL extraction benchmark (microseconds per message)\n")
+    print(f"{'corpus':<28}{'legacy':>12}{'current':>12}{'speedup':>10}")
+    print("=" * 62)
+
+    for name, messages in corpus.items():
+        # Both implementations must agree on which URLs are media
+        for message in messages:
+            if set(legacy_extract_urls(message)) != set(extract_urls(message)):
+                print(f"⚠️  {name}: results differ from the legacy extractor")
+                break
+
+        legacy = bench(legacy_extract_urls, messages, args.iterations)
+        current = bench(extract_urls, messages, args.iterations)
+        print(f"{name:<28}{legacy:>12.1f}{current:>12.1f}{legacy / current:>9.1f}x")
+
+        if args.max_us is not None and current > args.max_us:
+            print(f"❌ {name} exceeded {args.max_us} us per message")
+            failed = True
+
+    return not failed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the lean gateway mode.
+
+Feeds synthetic MESSAGE_CREATE payloads of a busy guild through a discord.py
+connection state configured like the bot, once in the default mode and once
+in lean mode (see lean_gateway.py), and reports the resident set size (RSS)
+retained by each along with the parse time per event. Each mode runs in its
+own process so the RSS figures do not affect each other. Messages are
+dispatched to a no-op handler, so only the gateway side is measured.
+
+Usage:
+    python bench_gateway.py [--messages N] [--channels N] [--monitored N] [--authors N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import discord
+
+from lean_gateway import install_lean_parser, lean_client_options
+
+GUILD_ID = 800000000000000000
+FIRST_CHANNEL_ID = 810000000000000000
+FIRST_AUTHOR_ID = 820000000000000000
+FIRST_MESSAGE_ID = 1200000000000000000
+
+WORDS = ("check out this new build it turned out great what do you think about "
+         "the lighting colors composition render took hours lol nice gg").split()
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def guild_payload(channels: int) -> Dict[str, Any]:
+    """A guild with text channels, as sent in GUILD_CREATE without the members intent."""
+    return {
+        "id": str(GUILD_ID),
+        "name": "Showcase",
+        "owner_id": str(FIRST_AUTHOR_ID),
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0,
+                   "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(FIRST_CHANNEL_ID + index), "type": 0, "name": f"channel-{index}",
+                      "position": index, "permission_overwrites": []}
+                     for index in range(channels)],
+        "emojis": [],
+        "stickers": [],
+        "member_count": 50000,
+        "members": [],
+        "presences": [],
+        "voice_states": [],
+        "threads": [],
+    }
+
+
+def message_payload(rng: random.Random, index: int, channels: int, authors: int) -> Dict[str, Any]:
+    """A MESSAGE_CREATE payload as Discord sends it for a guild text message."""
+    message_id = FIRST_MESSAGE_ID + index
+    channel_id = FIRST_CHANNEL_ID + rng.randrange(channels)
+    author_id = FIRST_AUTHOR_ID + rng.randrange(authors)
+    attachments = []
+    if rng.random() < 0.3:
+        attachments.append({
+            "id": str(message_id - 1),
+            "filename": f"render_{index}.png",
+            "size": rng.randint(100_000, 8_000_000),
+            "url": f"https://cdn.discordapp.com/attachments/{channel_id}/{message_id - 1}/render_{index}.png"
+                   f"?ex=67a1b2c3&is=67a06143&hm={rng.getrandbits(128):032x}&",
+            "proxy_url": f"https://media.discordapp.net/attachments/{channel_id}/{message_id - 1}/"
+                         f"render_{index}.png",
+            "width": 1920,
+            "height": 1080,
+            "content_type": "image/png",
+        })
+    return {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "guild_id": str(GUILD_ID),
+        "type": 0,
+        "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))),
+        "author": {"id": str(author_id), "username": f"user{author_id % 100000}",
+                   "global_name": f"User {author_id % 100000}", "avatar": f"{rng.getrandbits(128):032x}",
+                   "discriminator": "0", "public_flags": 0},
+        "member": {"roles": [], "nick": None, "joined_at": "2024-01-01T00:00:00.000000+00:00",
+                   "deaf": False, "mute": False, "flags": 0},
+        "attachments": attachments,
+        "embeds": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2026-10-17T12:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "flags": 0,
+        "components": [],
+        "nonce": str(message_id),
+    }
+
+
+def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Feed the payloads through one mode and measure it (child process)."""
+    if mode == "lean":
+        options = lean_client_options()
+    else:
+        intents = discord.Intents.default()
+        intents.message_content = True
+        options = {"intents": intents}
+    client = discord.Client(**options)
+    state = client._connection
+
+    dispatched = 0
+
+    def dispatch(event: str, *event_args: Any):
+        nonlocal dispatched
+        if event in ("message", "lean_message"):
+            dispatched += 1
+
+    state.dispatch = dispatch
+    state._add_guild_from_data(guild_payload(args.channels))
+    if mode == "lean":
+        monitored = [FIRST_CHANNEL_ID + index for index in range(args.monitored)]
+        install_lean_parser(state, monitored, "!")
+
+    rng = random.Random(0)
+    parse = state.parsers["MESSAGE_CREATE"]
+
+    gc.collect()
+    before = rss_bytes()
+    elapsed = 0.0
+    for index in range(args.messages):
+        # Each payload is garbage once parsed, unless the parser keeps it
+        data = message_payload(rng, index, args.channels, args.authors)
+        started = time.perf_counter()
+        parse(data)
+        elapsed += time.perf_counter() - started
+    del data
+    gc.collect()
+
+    return {
+        "mode": mode,
+        "messages": args.messages,
+        "dispatched": dispatched,
+        "cached_messages": len(state._messages or ()),
+        "retained_rss_mb": round((rss_bytes() - before) / 1024 / 1024, 1),
+        "us_per_event": round(elapsed / args.messages * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gateway memory use in default and lean mode")
+    parser.add_argument("--messages", type=int, default=200_000, help="MESSAGE_CREATE events to feed")
+    parser.add_argument("--channels", type=int, default=50, help="text channels in the guild")
+    parser.add_argument("--monitored", type=int, default=2, help="channels monitored by the bot")
+    parser.add_argument("--authors", type=int, default=20_000, help="distinct message authors")
+    parser.add_argument("--mode", choices=("default", "lean"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    forwarded = [f"--messages={args.messages}", f"--channels={args.channels}",
+                 f"--monitored={args.monitored}", f"--authors={args.authors}"]
+    results: List[Dict[str, Any]] = []
+    for mode in ("default", "lean"):
+        output = subprocess.run([sys.executable, __file__, f"--mode={mode}", *forwarded],
+                                check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    print(f"{args.messages} messages in {args.channels} channels ({args.monitored} monitored), "
+          f"{args.authors} authors\n")
+    print(f"{'mode':<8} {'dispatched':>10} {'cached msgs':>11} {'retained RSS':>12} {'parse time':>11}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['dispatched']:>10} {result['cached_messages']:>11} "
+              f"{result['retained_rss_mb']:>9.1f} MB {result['us_per_event']:>6.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
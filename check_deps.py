@@ -27,7 +27,6 @@ def main():
     
     dependencies = [
         ("discord.py", "discord"),
-        ("requests", "requests"),
         ("python-dotenv", "dotenv"),
         ("aiohttp", "aiohttp"),
     ]
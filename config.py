@@ -27,13 +27,85 @@ class Config:
         self.synology_username = os.getenv('SYNOLOGY_USERNAME')
         self.synology_password = os.getenv('SYNOLOGY_PASSWORD')
         self.synology_use_https = os.getenv('SYNOLOGY_USE_HTTPS', 'false').lower() == 'true'
+        self.synology_max_connections = int(os.getenv('SYNOLOGY_MAX_CONNECTIONS', 10))
+        self.synology_keepalive_timeout = float(os.getenv('SYNOLOGY_KEEPALIVE_TIMEOUT', 30))
+        self.synology_request_timeout = float(os.getenv('SYNOLOGY_REQUEST_TIMEOUT', 10))
+        self.synology_retry_attempts = int(os.getenv('SYNOLOGY_RETRY_ATTEMPTS', 4))
+        self.synology_retry_base_delay = float(os.getenv('SYNOLOGY_RETRY_BASE_DELAY', 0.5))
+        self.synology_retry_max_delay = float(os.getenv('SYNOLOGY_RETRY_MAX_DELAY', 30))
+        self.synology_breaker_threshold = int(os.getenv('SYNOLOGY_BREAKER_THRESHOLD', 5))
+        self.synology_breaker_reset_timeout = float(os.getenv('SYNOLOGY_BREAKER_RESET_TIMEOUT', 30))
+        self.synology_max_inflight = int(os.getenv('SYNOLOGY_MAX_INFLIGHT', 16))
+        self.synology_batch_window = float(os.getenv('SYNOLOGY_BATCH_WINDOW', 0.05))
+        self.synology_batch_max_size = int(os.getenv('SYNOLOGY_BATCH_MAX_SIZE', 20))
         
         # Download configuration
         self.download_destination = os.getenv('DOWNLOAD_DESTINATION', 'downloads/discord-media')
         
+        # Number of recent message IDs remembered per channel for de-duplication
+        self.dedup_window = int(os.getenv('DEDUP_WINDOW', 1024))
+        
+        # Media recently submitted from any channel, to skip reposts (size 0 disables)
+        self.media_dedup_size = int(os.getenv('MEDIA_DEDUP_SIZE', 50000))
+        self.media_dedup_ttl = float(os.getenv('MEDIA_DEDUP_TTL', 604800))
+        
+        # Modules that register extra media resolvers when imported
+        self.media_resolver_modules = [
+            name.strip() for name in os.getenv('MEDIA_RESOLVER_MODULES', '').split(',') if name.strip()
+        ]
+        
+        # Download task tracking configuration
+        self.task_tracking_enabled = os.getenv('TASK_TRACKING_ENABLED', 'true').lower() == 'true'
+        self.task_poll_min_interval = float(os.getenv('TASK_POLL_MIN_INTERVAL', 2))
+        self.task_poll_max_interval = float(os.getenv('TASK_POLL_MAX_INTERVAL', 60))
+        
+        # Persistent state configuration
+        self.state_db_path = os.getenv('STATE_DB_PATH', 'discord_showcase_loader.db')
+        self.state_flush_interval = float(os.getenv('STATE_FLUSH_INTERVAL', 1.0))
+        
+        # Startup catch-up configuration
+        self.backfill_enabled = os.getenv('BACKFILL_ENABLED', 'true').lower() == 'true'
+        self.backfill_checkpoint_every = int(os.getenv('BACKFILL_CHECKPOINT_EVERY', 100))
+        
+        # Ingestion pipeline configuration
+        self.pipeline_workers = int(os.getenv('PIPELINE_WORKERS', 4))
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', 1000))
+        self.pipeline_backpressure = os.getenv('PIPELINE_BACKPRESSURE', 'block').lower()
+        self.pipeline_spill_file = os.getenv('PIPELINE_SPILL_FILE', 'pipeline_spill.jsonl')
+        self.pipeline_drain_timeout = float(os.getenv('PIPELINE_DRAIN_TIMEOUT', 30))
+        
+        # Submission spool configuration
+        self.spool_enabled = os.getenv('SPOOL_ENABLED', 'true').lower() == 'true'
+        self.spool_path = os.getenv('SPOOL_PATH', 'submission_spool.jsonl')
+        self.spool_drain_rate = float(os.getenv('SPOOL_DRAIN_RATE', 5))
+        self.spool_fsync_interval = float(os.getenv('SPOOL_FSYNC_INTERVAL', 0.2))
+        
+        # Gateway recording configuration (empty to disable)
+        self.gateway_record_file = os.getenv('GATEWAY_RECORD_FILE', '')
+        
+        # Metrics endpoint configuration
+        self.metrics_enabled = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+        self.metrics_host = os.getenv('METRICS_HOST', '127.0.0.1')
+        self.metrics_port = int(os.getenv('METRICS_PORT', 9464))
+        
+        # Reaction configuration
+        self.reaction_interval = float(os.getenv('REACTION_INTERVAL', 0.25))
+        
+        # Lean gateway configuration
+        self.lean_gateway = os.getenv('LEAN_GATEWAY', 'false').lower() == 'true'
+        
+        # Event loop watchdog configuration
+        self.loop_watchdog_enabled = os.getenv('LOOP_WATCHDOG_ENABLED', 'true').lower() == 'true'
+        self.loop_lag_threshold = float(os.getenv('LOOP_LAG_THRESHOLD', 0.1))
+        self.loop_watchdog_interval = float(os.getenv('LOOP_WATCHDOG_INTERVAL', 0.1))
+        
         # Logging configuration
         self.log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
         self.log_file = os.getenv('LOG_FILE', 'discord_showcase_loader.log')
+        self.log_format = os.getenv('LOG_FORMAT', 'text').lower()
+        self.log_max_bytes = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+        self.log_backup_count = int(os.getenv('LOG_BACKUP_COUNT', 5))
+        self.log_url_sample_rate = float(os.getenv('LOG_URL_SAMPLE_RATE', 1.0))
     
     def _parse_channel_ids(self, channel_ids_str: str) -> List[int]:
         """Parse channel IDs from comma-separated string."""
@@ -73,6 +145,89 @@ class Config:
         if self.synology_port <= 0 or self.synology_port > 65535:
             errors.append("Invalid SYNOLOGY_PORT (must be 1-65535)")
         
+        if self.synology_max_connections <= 0:
+            errors.append("Invalid SYNOLOGY_MAX_CONNECTIONS (must be positive)")
+        
+        if self.synology_retry_attempts <= 0:
+            errors.append("Invalid SYNOLOGY_RETRY_ATTEMPTS (must be positive)")
+        
+        if self.synology_breaker_threshold <= 0:
+            errors.append("Invalid SYNOLOGY_BREAKER_THRESHOLD (must be positive)")
+        
+        if self.synology_max_inflight <= 0:
+            errors.append("Invalid SYNOLOGY_MAX_INFLIGHT (must be positive)")
+        
+        if self.synology_batch_window < 0:
+            errors.append("Invalid SYNOLOGY_BATCH_WINDOW (must not be negative)")
+        
+        if self.synology_batch_max_size <= 0:
+            errors.append("Invalid SYNOLOGY_BATCH_MAX_SIZE (must be positive)")
+        
+        if self.dedup_window <= 0:
+            errors.append("Invalid DEDUP_WINDOW (must be positive)")
+        
+        if self.media_dedup_size < 0:
+            errors.append("Invalid MEDIA_DEDUP_SIZE (must be zero or positive)")
+        
+        if self.media_dedup_ttl < 0:
+            errors.append("Invalid MEDIA_DEDUP_TTL (must be zero or positive)")
+        
+        if self.task_poll_min_interval <= 0:
+            errors.append("Invalid TASK_POLL_MIN_INTERVAL (must be positive)")
+        
+        if self.task_poll_max_interval < self.task_poll_min_interval:
+            errors.append("Invalid TASK_POLL_MAX_INTERVAL (must not be below TASK_POLL_MIN_INTERVAL)")
+        
+        if self.state_flush_interval <= 0:
+            errors.append("Invalid STATE_FLUSH_INTERVAL (must be positive)")
+        
+        if self.backfill_checkpoint_every <= 0:
+            errors.append("Invalid BACKFILL_CHECKPOINT_EVERY (must be positive)")
+        
+        if self.pipeline_workers <= 0:
+            errors.append("Invalid PIPELINE_WORKERS (must be positive)")
+        
+        if self.pipeline_queue_size <= 0:
+            errors.append("Invalid PIPELINE_QUEUE_SIZE (must be positive)")
+        
+        if self.pipeline_backpressure not in ('block', 'drop-oldest', 'spill'):
+            errors.append("Invalid PIPELINE_BACKPRESSURE (must be block, drop-oldest or spill)")
+        elif self.pipeline_backpressure == 'spill' and not self.pipeline_spill_file:
+            errors.append("PIPELINE_SPILL_FILE is required with the spill backpressure policy")
+        
+        if self.pipeline_drain_timeout < 0:
+            errors.append("Invalid PIPELINE_DRAIN_TIMEOUT (must be zero or positive)")
+        
+        if self.spool_drain_rate <= 0:
+            errors.append("Invalid SPOOL_DRAIN_RATE (must be positive)")
+        
+        if self.spool_fsync_interval <= 0:
+            errors.append("Invalid SPOOL_FSYNC_INTERVAL (must be positive)")
+        
+        if self.metrics_port <= 0 or self.metrics_port > 65535:
+            errors.append("Invalid METRICS_PORT (must be 1-65535)")
+        
+        if self.reaction_interval < 0:
+            errors.append("Invalid REACTION_INTERVAL (must not be negative)")
+        
+        if self.loop_lag_threshold <= 0:
+            errors.append("Invalid LOOP_LAG_THRESHOLD (must be positive)")
+        
+        if self.loop_watchdog_interval <= 0:
+            errors.append("Invalid LOOP_WATCHDOG_INTERVAL (must be positive)")
+        
+        if self.log_format not in ('text', 'json'):
+            errors.append("Invalid LOG_FORMAT (must be text or json)")
+        
+        if self.log_max_bytes < 0:
+            errors.append("Invalid LOG_MAX_BYTES (must not be negative)")
+        
+        if self.log_backup_count < 0:
+            errors.append("Invalid LOG_BACKUP_COUNT (must not be negative)")
+        
+        if not 0 <= self.log_url_sample_rate <= 1:
+            errors.append("Invalid LOG_URL_SAMPLE_RATE (must be between 0 and 1)")
+        
         return errors
     
     def is_valid(self) -> bool:
@@ -87,8 +242,25 @@ class Config:
   Synology Host: {self.synology_host}
   Synology Port: {self.synology_port}
   Synology HTTPS: {self.synology_use_https}
+  Synology Max Connections: {self.synology_max_connections}
+  Synology Retries: {self.synology_retry_attempts} attempt(s), breaker after {self.synology_breaker_threshold} failure(s)
+  Synology Max In-flight Requests: {self.synology_max_inflight}
+  Synology Batch Window: {self.synology_batch_window}s (max {self.synology_batch_max_size} URLs)
   Synology Username: {'Set' if self.synology_username else 'Not set'}
   Synology Password: {'Set' if self.synology_password else 'Not set'}
   Download Destination: {self.download_destination}
+  Repost Skipping: {f'{self.media_dedup_size} URL(s) for {self.media_dedup_ttl:g}s' if self.media_dedup_size > 0 else 'Disabled'}
+  Media Resolver Modules: {', '.join(self.media_resolver_modules) or 'None'}
+  Task Tracking: {self.task_tracking_enabled}
+  State Database: {self.state_db_path}
+  Startup Catch-up: {self.backfill_enabled}
+  Pipeline: {self.pipeline_workers} worker(s), queue size {self.pipeline_queue_size}, {self.pipeline_backpressure} backpressure, {self.pipeline_drain_timeout}s drain on shutdown
+  Submission Spool: {self.spool_path if self.spool_enabled else 'Disabled'}
+  Gateway Recording: {self.gateway_record_file or 'Disabled'}
+  Metrics Endpoint: {f'http://{self.metrics_host}:{self.metrics_port}/metrics' if self.metrics_enabled else 'Disabled'}
+  Reaction Interval: {self.reaction_interval}s per channel
+  Lean Gateway: {self.lean_gateway}
+  Event Loop Watchdog: {f'stalls over {self.loop_lag_threshold}s' if self.loop_watchdog_enabled else 'Disabled'}
   Log Level: {self.log_level}
-  Log File: {self.log_file}"""
\ No newline at end of file
+  Log File: {self.log_file} ({self.log_format}, rotated at {self.log_max_bytes} bytes, {self.log_backup_count} backup(s))
+  Per-URL Log Sampling: {self.log_url_sample_rate}"""
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Memory-bounded tracking of processed Discord messages and downloaded media.
+"""
+import heapq
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class _ChannelWindow:
+    """Watermark and recent-ID window for a single channel."""
+
+    __slots__ = ("high_water", "floor", "ids", "heap")
+
+    def __init__(self):
+        self.high_water = 0
+        self.floor = 0
+        self.ids = set()
+        self.heap: List[int] = []  # Same IDs as ``ids``, lowest first
+
+
+class ProcessedMessageTracker:
+    """
+    Tracks processed message IDs per channel in constant memory.
+
+    Discord snowflakes grow with time, so each channel keeps a high-water mark
+    (the newest processed ID) and a fixed-size window of recently processed
+    IDs to catch messages that arrive out of order. When the window is full
+    its lowest ID is evicted and becomes the channel's floor; every ID at or
+    below the floor is treated as processed. Evicting the lowest ID rather
+    than the oldest keeps the floor below any gap, so older messages that
+    arrive after newer ones (catch-up after a restart, while live messages
+    come in) are not mistaken for processed ones. Memory is
+    O(channels * window) regardless of how many messages have been seen,
+    lookups are O(1) and marking is O(log window).
+    """
+
+    def __init__(self, window: int = 1024):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent message IDs remembered per channel
+        """
+        self.window = max(1, window)
+        self._channels: Dict[int, _ChannelWindow] = {}
+
+    def is_processed(self, channel_id: int, message_id: int) -> bool:
+        """Check whether a message has already been processed."""
+        state = self._channels.get(channel_id)
+        if state is None or message_id > state.high_water:
+            return False
+        return message_id <= state.floor or message_id in state.ids
+
+    def mark_processed(self, channel_id: int, message_id: int) -> bool:
+        """
+        Record a message as processed.
+
+        Returns:
+            True if the message was new, False if it was already processed
+        """
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = _ChannelWindow()
+        elif message_id <= state.floor or message_id in state.ids:
+            return False
+
+        if len(state.heap) >= self.window:
+            # Every ID in the window is above the floor, so this only raises it
+            state.floor = heapq.heappushpop(state.heap, message_id)
+            if state.floor != message_id:
+                state.ids.discard(state.floor)
+                state.ids.add(message_id)
+        else:
+            heapq.heappush(state.heap, message_id)
+            state.ids.add(message_id)
+
+        if message_id > state.high_water:
+            state.high_water = message_id
+        return True
+
+    def high_water(self, channel_id: int) -> int:
+        """Return the newest processed message ID for a channel (0 if none)."""
+        state = self._channels.get(channel_id)
+        return state.high_water if state else 0
+
+    def __len__(self) -> int:
+        """Return the number of message IDs currently held in memory."""
+        return sum(len(state.heap) for state in self._channels.values())
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Report the size of the tracker.
+
+        Returns:
+            Number of channels, retained IDs and approximate bytes used
+        """
+        size = sys.getsizeof(self._channels)
+        for channel_id, state in self._channels.items():
+            size += sys.getsizeof(channel_id) + sys.getsizeof(state)
+            size += sys.getsizeof(state.ids) + sys.getsizeof(state.heap)
+            size += sum(sys.getsizeof(message_id) for message_id in state.heap)
+        return {
+            "channels": len(self._channels),
+            "tracked_ids": len(self),
+            "bytes": size,
+        }
+
+
+class SeenMediaCache:
+    """
+    Remembers recently submitted media by canonical key (see media_extractor).
+
+    A bounded LRU with a time-to-live: an entry expires ``ttl`` seconds
+    after the media was last posted, and the least recently posted entry is
+    evicted once ``max_entries`` are held. Expired entries are always at the
+    front, so they are dropped as new keys come in without scanning.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Keys remembered at most
+            ttl: Seconds a key is remembered after it was last seen (0 for no expiry)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of keys held."""
+        return len(self._seen)
+
+    def add(self, key: str) -> bool:
+        """
+        Record that media was posted.
+
+        Returns:
+            True if the key is new, False if it was seen within the TTL
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        seen = key in self._seen
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        if seen:
+            self.hits += 1
+            return False
+
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return True
+
+    def discard(self, key: str):
+        """Forget a key, e.g. because its download failed and a repost should retry it."""
+        self._seen.pop(key, None)
+
+    def _expire(self, now: float):
+        """Drop entries older than the TTL."""
+        if not self.ttl:
+            return
+        cutoff = now - self.ttl
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if seen_at > cutoff:
+                break
+            del self._seen[key]
@@ -2,69 +2,172 @@
 Discord Showcase Loader - Automatically download media from Discord to Synology NAS
 """
 import os
+import time
 import logging
 import asyncio
-import re
-from typing import List, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import discord
 from discord.ext import commands
 
-from synology_client import SynologyDownloadStation
+from synology_client import SynologyDownloadStation, BatchSubmitter, CircuitBreaker, RetryPolicy, TaskResult
+from archive import ArchiveCommands, ChannelArchiver, parse_since
+from backfill import HistoryCrawler
 from config import Config
+from dedup import ProcessedMessageTracker, SeenMediaCache
+from lean_gateway import install_lean_parser, lean_client_options
+from logging_setup import SAMPLED, setup_logging
+from loop_watchdog import LoopWatchdog
+from metrics import BotMetrics, MetricsServer
+from media_extractor import (DEFAULT_REGISTRY, canonical_url_key, extract_urls, is_media_file,
+                             load_resolver_modules)
+from pipeline import DownloadJob, IngestPipeline, MediaJob
+from reactions import (ReactionScheduler, STATUS_ERROR, STATUS_FAILED, STATUS_QUEUED,
+                       STATUS_REPOST, STATUS_SPOOLED, worst_status)
+from recorder import GatewayRecorder
+from spool import SpoolInUseError, SubmissionSpool
+from state_store import StateStore
+from task_tracker import FAILED_STATUSES, TaskTracker
 
 # Initialize configuration
 config = Config()
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, config.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(config.log_file),
-        logging.StreamHandler()
-    ]
+# Configure logging; formatting and file I/O run on a background thread
+log_listener = setup_logging(
+    level=config.log_level,
+    log_file=config.log_file,
+    json_format=config.log_format == 'json',
+    max_bytes=config.log_max_bytes,
+    backup_count=config.log_backup_count,
+    sample_rate=config.log_url_sample_rate
 )
 logger = logging.getLogger(__name__)
 
-# Media file extensions to look for
-MEDIA_EXTENSIONS = {
-    'images': {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.tiff', '.ico'},
-    'videos': {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv', '.m4v', '.3gp', '.ogv'}
-}
-
-# URL patterns for common media hosting sites
-MEDIA_URL_PATTERNS = [
-    r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+',
-    r'https?://(?:www\.)?vimeo\.com/\d+',
-    r'https?://(?:www\.)?twitch\.tv/\w+',
-    r'https?://(?:i\.)?imgur\.com/\w+\.(?:jpg|jpeg|png|gif|webp)',
-    r'https?://(?:www\.)?reddit\.com/\w+',
-    r'https?://(?:cdn\.)?discordapp\.com/attachments/[\w/.-]+',
-    r'https?://media\.discordapp\.net/attachments/[\w/.-]+',
-]
-
 class DiscordShowcaseLoader(commands.Bot):
     """Discord bot for automatically downloading media to Synology NAS."""
     
-    def __init__(self):
-        """Initialize the Discord bot."""
-        intents = discord.Intents.default()
-        intents.message_content = True
+    def __init__(self, live: bool = True):
+        """
+        Initialize the Discord bot.
+        
+        Args:
+            live: Process incoming messages and catch up on missed ones, and run
+                the ingest pipeline, task tracking and metrics endpoint. Disabled
+                for one-off runs such as the archive CLI, which may run next to
+                the live bot.
+        """
+        if config.lean_gateway:
+            # Only the intents the bot needs, without message and member caches
+            options = lean_client_options()
+        else:
+            intents = discord.Intents.default()
+            intents.message_content = True
+            options = {"intents": intents}
         
-        super().__init__(command_prefix='!', intents=intents)
+        super().__init__(command_prefix='!', **options)
         
         self.config = config
+        self.live = live
+        if load_resolver_modules(config.media_resolver_modules):
+            logger.info(f"Media resolvers for: {', '.join(DEFAULT_REGISTRY.hosts())}")
+        if live and config.lean_gateway:
+            install_lean_parser(self._connection, config.channel_ids, self.command_prefix)
         self.synology = SynologyDownloadStation(
             host=config.synology_host,
             port=config.synology_port,
             use_https=config.synology_use_https,
             username=config.synology_username,
-            password=config.synology_password
+            password=config.synology_password,
+            max_connections=config.synology_max_connections,
+            keepalive_timeout=config.synology_keepalive_timeout,
+            request_timeout=config.synology_request_timeout,
+            retry_policy=RetryPolicy(
+                attempts=config.synology_retry_attempts,
+                base_delay=config.synology_retry_base_delay,
+                max_delay=config.synology_retry_max_delay
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=config.synology_breaker_threshold,
+                reset_timeout=config.synology_breaker_reset_timeout
+            )
+        )
+        self.submitter = BatchSubmitter(
+            self.synology,
+            window=config.synology_batch_window,
+            max_batch_size=config.synology_batch_max_size,
+            max_in_flight=config.synology_max_inflight
+        )
+        
+        # One status reaction per message, paced per channel
+        self.reaction_scheduler = ReactionScheduler(self._send_reaction,
+                                                    interval=config.reaction_interval,
+                                                    remove=self._remove_reaction)
+        
+        # Submissions made while the NAS is unreachable wait on disk
+        self.spool: Optional[SubmissionSpool] = None
+        if config.spool_enabled:
+            self.spool = SubmissionSpool(
+                config.spool_path,
+                self._submit_spooled,
+                drain_rate=config.spool_drain_rate,
+                fsync_interval=config.spool_fsync_interval
+            )
+        
+        self.task_tracker = TaskTracker(
+            self.synology,
+            min_interval=config.task_poll_min_interval,
+            max_interval=config.task_poll_max_interval
+        )
+        self.task_tracker.add_callback(self._on_task_finished)
+        
+        self.pipeline = IngestPipeline(
+            self._process_job,
+            workers=config.pipeline_workers,
+            maxsize=config.pipeline_queue_size,
+            policy=config.pipeline_backpressure,
+            spill_path=config.pipeline_spill_file,
+            restore=self._restore_job,
+            drain_timeout=config.pipeline_drain_timeout
+        )
+        
+        self.processed_messages = ProcessedMessageTracker(window=config.dedup_window)
+        
+        # Media already submitted, by canonical URL, so reposts are not downloaded again
+        self.seen_media: Optional[SeenMediaCache] = None
+        if config.media_dedup_size > 0:
+            self.seen_media = SeenMediaCache(config.media_dedup_size, config.media_dedup_ttl)
+        self.state = StateStore(config.state_db_path, flush_interval=config.state_flush_interval)
+        
+        self.crawler = HistoryCrawler(
+            self._handle_message,
+            self._checkpoint_channel,
+            checkpoint_every=config.backfill_checkpoint_every
         )
+        self._backfilling: Set[int] = set()
+        self._catch_up_task: Optional[asyncio.Task] = None
+        
+        self.metrics = BotMetrics()
+        self._register_metrics()
+        self.metrics_server: Optional[MetricsServer] = None
+        if live and config.metrics_enabled:
+            self.metrics_server = MetricsServer(self.metrics.registry, config.metrics_host,
+                                                config.metrics_port)
         
-        self.processed_messages: Set[int] = set()
+        # Flag anything that blocks the event loop, with the stack that blocked it
+        self.loop_watchdog: Optional[LoopWatchdog] = None
+        if config.loop_watchdog_enabled:
+            self.loop_watchdog = LoopWatchdog(
+                threshold=config.loop_lag_threshold,
+                interval=config.loop_watchdog_interval,
+                on_lag=self.metrics.loop_lag_seconds.observe
+            )
+        
+        # Optionally record raw message events for offline replay
+        self.recorder: Optional[GatewayRecorder] = None
+        if live and config.gateway_record_file:
+            self.recorder = GatewayRecorder(config.gateway_record_file, config.channel_ids)
+            self.recorder.install(self._connection)
         
     async def setup_hook(self):
         """Setup hook called when the bot starts."""
@@ -76,6 +179,12 @@ class DiscordShowcaseLoader(commands.Bot):
             await self.close()
             return
         
+        if self.loop_watchdog is not None:
+            await self.loop_watchdog.start()
+        
+        # Open the persistent state database
+        await self.state.open()
+        
         # Login to Synology NAS
         if not await self.synology.login():
             logger.error("Failed to login to Synology NAS")
@@ -84,6 +193,80 @@ class DiscordShowcaseLoader(commands.Bot):
             
         logger.info("Successfully connected to Synology NAS")
         
+        if self.spool is not None:
+            try:
+                await self.spool.open()
+            except SpoolInUseError as e:
+                # The live bot owns the spool; submissions to an unreachable NAS fail instead
+                logger.warning(f"Submission spool disabled: {str(e)}")
+                self.spool = None
+        if self.live:
+            # The spill file and tracked tasks belong to the live bot
+            await self.pipeline.start()
+            if self.config.task_tracking_enabled:
+                await self.task_tracker.start()
+        
+        if self.recorder is not None:
+            await self.recorder.start()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+        
+        await self.add_cog(ArchiveCommands(self))
+        
+        # Download anything posted while the bot was offline
+        if self.live and self.config.backfill_enabled:
+            self._catch_up_task = asyncio.create_task(self._catch_up())
+        
+    def _register_metrics(self):
+        """Export state kept by the bot's components; read only when scraped."""
+        metrics = self.metrics
+        metrics.gauge("dsl_queue_depth", "Messages waiting for a pipeline worker",
+                      self.pipeline.qsize)
+        metrics.gauge("dsl_nas_in_flight", "NAS requests waiting for a response",
+                      lambda: self.synology.in_flight)
+        metrics.gauge("dsl_dedup_tracked_ids", "Message IDs held by the duplicate tracker",
+                      lambda: len(self.processed_messages))
+        metrics.gauge("dsl_seen_media", "Canonical media URLs remembered to skip reposts",
+                      lambda: len(self.seen_media) if self.seen_media is not None else 0)
+        metrics.counter("dsl_reposts_skipped_total", "Media URLs skipped because they were posted before",
+                        lambda: self.seen_media.hits if self.seen_media is not None else 0)
+        metrics.gauge("dsl_tracked_tasks", "Download tasks being followed on the NAS",
+                      lambda: len(self.task_tracker))
+        metrics.gauge("dsl_spool_pending", "Submissions waiting in the spool",
+                      lambda: self.spool.pending if self.spool is not None else 0)
+        metrics.counter("dsl_nas_logins_total", "Logins to the NAS",
+                        lambda: self.synology.sessions.logins)
+        metrics.counter("dsl_nas_retries_total", "Retried NAS requests",
+                        lambda: self.synology.retry.retries)
+        metrics.counter("dsl_nas_breaker_opened_total", "Times the NAS circuit breaker opened",
+                        lambda: self.synology.breaker.times_opened)
+        metrics.gauge("dsl_reactions_pending", "Messages waiting for their status reaction",
+                      lambda: len(self.reaction_scheduler))
+        metrics.counter("dsl_reactions_coalesced_total",
+                        "Status reactions merged into one already waiting for the same message",
+                        lambda: self.reaction_scheduler.coalesced)
+        metrics.counter("dsl_event_loop_stalls_total",
+                        "Times the event loop was blocked past the stall threshold",
+                        lambda: self.loop_watchdog.stalls if self.loop_watchdog is not None else 0)
+        self.synology.observe_request = self._observe_nas_request
+    
+    def _observe_nas_request(self, method: str, seconds: float):
+        """Record the latency of one NAS request."""
+        self.metrics.nas_request_seconds.labels(method).observe(seconds)
+    
+    def _count_url(self, kind: str):
+        """Count an extracted media URL by the pattern that matched it."""
+        self.metrics.urls_extracted.labels(kind).inc()
+    
+    async def _send_reaction(self, channel_id: int, message_id: int, emoji: str):
+        """React to a message; Discord errors are left to the reaction scheduler."""
+        await self._partial_message(channel_id, message_id).add_reaction(emoji)
+        self.metrics.reactions.labels(emoji).inc()
+    
+    async def _remove_reaction(self, channel_id: int, message_id: int, emoji: str):
+        """Remove the bot's own reaction from a message."""
+        await self._partial_message(channel_id, message_id).remove_reaction(emoji, self.user)
+    
     def _validate_config(self) -> bool:
         """Validate the configuration."""
         errors = self.config.validate()
@@ -102,34 +285,154 @@ class DiscordShowcaseLoader(commands.Bot):
         
     async def on_message(self, message: discord.Message):
         """Handle new messages."""
+        if not self.live:
+            return
+        
+        # In lean mode media arrives through on_lean_message; only commands come here
+        if not self.config.lean_gateway:
+            await self._handle_message(message)
+        await self.process_commands(message)
+    
+    async def on_lean_message(self, message: Any):
+        """Handle a compact message from a monitored channel in lean gateway mode."""
+        await self._handle_message(message)
+    
+    async def _handle_message(self, message: discord.Message):
+        """Queue the media of a live or backfilled message for download."""
+        received = time.perf_counter()
+        self.metrics.messages_seen.inc()
+        
         # Skip if message is from bot itself
-        if message.author == self.user:
+        if self.user is not None and message.author.id == self.user.id:
             return
             
         # Skip if message is not in monitored channels
         if message.channel.id not in self.config.channel_ids:
             return
+        
+        # Advance the channel watermark; during catch-up the crawler checkpoints instead
+        if message.channel.id not in self._backfilling:
+            self.state.record_watermark(message.channel.id, message.id)
             
         # Skip if message was already processed
-        if message.id in self.processed_messages:
+        if self.processed_messages.is_processed(message.channel.id, message.id):
+            return
+        
+        # Skip if message was processed before a restart
+        if await self.state.is_message_processed(message.id):
+            self.processed_messages.mark_processed(message.channel.id, message.id)
             return
             
-        logger.info(f"Processing message from {message.author} in #{message.channel.name}")
+        log_context = {"channel_id": message.channel.id, "message_id": message.id}
+        logger.info(f"Processing message from {message.author} in #{message.channel.name}",
+                    extra=log_context)
         
         # Mark message as processed
-        self.processed_messages.add(message.id)
+        self.processed_messages.mark_processed(message.channel.id, message.id)
+        self.state.record_message(message.channel.id, message.id)
         
         # Extract media URLs from the message
+        extraction_started = time.perf_counter()
         media_urls = self._extract_media_urls(message)
+        self.metrics.extraction_seconds.observe(time.perf_counter() - extraction_started)
         
         if media_urls:
-            logger.info(f"Found {len(media_urls)} media URL(s) in message")
+            logger.info(f"Found {len(media_urls)} media URL(s) in message", extra=log_context)
             
-            # Download each media URL
-            for url in media_urls:
-                await self._download_media(url, message)
+            # Hand the URLs to the worker pool; submission happens off the event handler
+            media = self._build_media_jobs(message, media_urls)
+            await self.pipeline.put(DownloadJob(message.channel.id, message.id, media, received))
         else:
             logger.debug("No media found in message")
+    
+    async def _catch_up(self):
+        """Backfill every monitored channel from its stored watermark."""
+        await self.wait_until_ready()
+        
+        results = await asyncio.gather(
+            *(self._catch_up_channel(channel_id) for channel_id in self.config.channel_ids),
+            return_exceptions=True
+        )
+        
+        for channel_id, result in zip(self.config.channel_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Catch-up failed for channel {channel_id}: {str(result)}")
+    
+    async def _catch_up_channel(self, channel_id: int):
+        """Backfill one channel from its stored watermark."""
+        watermark = await self.state.get_watermark(channel_id)
+        if watermark is None:
+            logger.info(f"No watermark for channel {channel_id}, skipping catch-up")
+            return
+        
+        channel = self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+        
+        # Until the crawl finishes, live messages must not move the watermark past
+        # the backlog. If it fails or is cancelled the channel stays frozen at the
+        # crawler's last checkpoint, so the next start resumes from there.
+        self._backfilling.add(channel_id)
+        logger.info(f"Catching up on #{channel.name} after message {watermark}")
+        count = await self.crawler.crawl(channel, after=watermark)
+        logger.info(f"Caught up on {count} message(s) in #{channel.name}")
+        
+        # Live messages received during catch-up did not move the watermark
+        self._backfilling.discard(channel_id)
+        newest = self.processed_messages.high_water(channel_id)
+        if newest:
+            self.state.record_watermark(channel_id, newest)
+    
+    async def _checkpoint_channel(self, channel_id: int, message_id: int):
+        """Persist catch-up progress for a channel."""
+        self.state.record_watermark(channel_id, message_id)
+        await self.state.flush()
+    
+    async def _process_job(self, job: DownloadJob):
+        """Submit every media URL of a queued job to the NAS concurrently."""
+        results = await asyncio.gather(
+            *(self._download_media(media) for media in job.media),
+            return_exceptions=True
+        )
+        self.metrics.message_queued_seconds.observe(time.perf_counter() - job.received)
+        
+        # Log outcomes in message order regardless of completion order
+        log_context = {"channel_id": job.channel_id, "message_id": job.message_id}
+        statuses = []
+        for url, result in zip((media.url for media in job.media), results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error downloading media {url}: {str(result)}",
+                             extra={**log_context, "url": url})
+                statuses.append(STATUS_ERROR)
+            elif result == STATUS_FAILED:
+                logger.error(f"Failed to queue download: {url}", extra={**log_context, "url": url})
+                statuses.append(result)
+            elif result == STATUS_REPOST:
+                logger.info(f"Skipped repost of already queued media: {url}",
+                            extra={**log_context, **SAMPLED, "url": url})
+                statuses.append(result)
+            else:
+                logger.info(f"Successfully queued download: {url}",
+                            extra={**log_context, **SAMPLED, "url": url})
+                statuses.append(result)
+        
+        # A single reaction for the whole message, e.g. ❌ if any URL failed
+        self.reaction_scheduler.set_status(job.channel_id, job.message_id, worst_status(statuses))
+    
+    async def _restore_job(self, record: Dict[str, Any]) -> Optional[DownloadJob]:
+        """Rebuild a spilled job by fetching its message again."""
+        channel = self.get_channel(record["channel_id"])
+        if channel is None:
+            channel = await self.fetch_channel(record["channel_id"])
+        
+        try:
+            message = await channel.fetch_message(record["message_id"])
+        except discord.NotFound:
+            logger.warning(f"Spilled message {record['message_id']} no longer exists")
+            return None
+        
+        media_urls = self._extract_media_urls(message)
+        if not media_urls:
+            return None
+        return DownloadJob(message.channel.id, message.id, self._build_media_jobs(message, media_urls))
             
     def _extract_media_urls(self, message: discord.Message) -> List[str]:
         """Extract media URLs from a Discord message."""
@@ -137,100 +440,231 @@ class DiscordShowcaseLoader(commands.Bot):
         
         # Check message attachments
         for attachment in message.attachments:
-            if self._is_media_file(attachment.filename):
+            if is_media_file(attachment.filename):
                 media_urls.append(attachment.url)
-                logger.info(f"Found attachment: {attachment.filename}")
+                self._count_url("attachment")
+                logger.info(f"Found attachment: {attachment.filename}", extra=SAMPLED)
         
         # Check message content for URLs
-        if message.content:
-            # Find URLs using regex patterns
-            for pattern in MEDIA_URL_PATTERNS:
-                matches = re.findall(pattern, message.content, re.IGNORECASE)
-                media_urls.extend(matches)
-            
-            # Find direct media file URLs
-            url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+\.(?:' + '|'.join(
-                ext.lstrip('.') for exts in MEDIA_EXTENSIONS.values() for ext in exts
-            ) + r')'
-            direct_media_urls = re.findall(url_pattern, message.content, re.IGNORECASE)
-            media_urls.extend(direct_media_urls)
+        media_urls.extend(extract_urls(message.content, self._count_url))
         
         # Remove duplicates while preserving order
         return list(dict.fromkeys(media_urls))
     
     def _is_media_file(self, filename: str) -> bool:
         """Check if a filename represents a media file."""
-        if not filename:
-            return False
-            
-        # Get file extension
-        file_ext = os.path.splitext(filename.lower())[1]
-        
-        # Check against known media extensions
-        all_extensions = set()
-        for extensions in MEDIA_EXTENSIONS.values():
-            all_extensions.update(extensions)
-            
-        return file_ext in all_extensions
+        return is_media_file(filename)
     
-    async def _download_media(self, url: str, message: discord.Message):
-        """Download media to Synology NAS."""
-        try:
-            # Create a descriptive filename based on the message
-            timestamp = message.created_at.strftime("%Y%m%d_%H%M%S")
-            channel_name = message.channel.name.replace(' ', '_')
-            author_name = message.author.display_name.replace(' ', '_')
-            
+    def _build_media_jobs(self, message: discord.Message, media_urls: List[str]) -> Tuple[MediaJob, ...]:
+        """
+        Turn the media URLs of a message into compact jobs.
+        
+        The timestamp, channel and author parts of the filenames and the
+        destination are worked out once per message.
+        """
+        timestamp = message.created_at.strftime("%Y%m%d_%H%M%S")
+        channel_name = message.channel.name.replace(' ', '_')
+        author_name = message.author.display_name.replace(' ', '_')
+        prefix = f"{timestamp}_{channel_name}_{author_name}"
+        destination = f"{self.config.download_destination}/{channel_name}"
+        sizes = {attachment.url: attachment.size for attachment in message.attachments}
+        
+        jobs = []
+        for url in media_urls:
             # Extract filename from URL if possible
-            parsed_url = urlparse(url)
-            original_filename = os.path.basename(parsed_url.path)
-            
+            original_filename = os.path.basename(urlparse(url).path)
             if original_filename and '.' in original_filename:
-                base_name, ext = os.path.splitext(original_filename)
-                filename = f"{timestamp}_{channel_name}_{author_name}_{base_name}{ext}"
-            else:
-                filename = f"{timestamp}_{channel_name}_{author_name}"
-            
-            # Create destination path
-            destination = f"{self.config.download_destination}/{channel_name}"
-            
-            # Create download task
-            success = await self.synology.create_download_task(url, destination)
-            
-            if success:
-                logger.info(f"Successfully queued download: {url}")
-                
-                # React to the message to indicate success
-                try:
-                    await message.add_reaction('✅')
-                except discord.HTTPException:
-                    logger.warning("Could not add reaction to message")
-                    
+                filename = f"{prefix}_{original_filename}"
             else:
-                logger.error(f"Failed to queue download: {url}")
-                
-                # React to the message to indicate failure
-                try:
-                    await message.add_reaction('❌')
-                except discord.HTTPException:
-                    logger.warning("Could not add reaction to message")
-                    
-        except Exception as e:
-            logger.error(f"Error downloading media {url}: {str(e)}")
-            
-            # React to the message to indicate error
-            try:
-                await message.add_reaction('⚠️')
-            except discord.HTTPException:
-                logger.warning("Could not add reaction to message")
+                filename = prefix
+            jobs.append(MediaJob(message.channel.id, message.id, url, destination, filename,
+                                 sizes.get(url)))
+        return tuple(jobs)
+    
+    def _partial_message(self, channel_id: int, message_id: int) -> discord.PartialMessage:
+        """Return a message reference that can be reacted to without fetching it."""
+        return self.get_partial_messageable(channel_id).get_partial_message(message_id)
+    
+    async def _download_media(self, job: MediaJob, react: bool = True) -> str:
+        """
+        Download media to Synology NAS.
+        
+        Args:
+            job: The media URL and where it came from
+            react: Whether the message gets a reaction when a spooled download
+                is replayed
+        
+        Returns:
+            STATUS_QUEUED if the download was queued, STATUS_SPOOLED if it was
+            kept until the NAS is back, STATUS_FAILED if the NAS rejected it,
+            STATUS_REPOST if the same media was already submitted. Unexpected
+            errors are raised.
+        """
+        url = job.url
+        
+        # Skip media already submitted from any message, whatever its URL looks like
+        if self.seen_media is not None:
+            media_key = canonical_url_key(url)
+            if not self.seen_media.add(media_key):
+                return STATUS_REPOST
+            # Not in memory; it may have been submitted before a restart
+            if await self._submitted_before(media_key):
+                self.seen_media.hits += 1
+                return STATUS_REPOST
+        
+        # While the NAS is known to be down, spool instead of waiting on it
+        result = None
+        try:
+            if self.spool is None or not self.synology.breaker.is_open:
+                # Create download task; the submitter caps in-flight NAS requests
+                result = await self.submitter.submit(url, job.destination)
+        except BaseException:
+            self._forget_media(url)
+            raise
+        
+        if self.spool is not None and (result is None or result.unreachable):
+            await self.spool.put({
+                "url": url,
+                "destination": job.destination,
+                "channel_id": job.channel_id,
+                "message_id": job.message_id,
+                "react": react,
+            })
+            logger.warning(f"NAS unavailable, spooled download for later: {url}")
+            return STATUS_SPOOLED
+        
+        if not result:
+            self.metrics.tasks_failed.labels("submit").inc()
+            self._forget_media(url)
+            return STATUS_FAILED
+        
+        self._record_submission(result, url, job.destination, job.channel_id, job.message_id)
+        return STATUS_QUEUED
+    
+    async def _submitted_before(self, media_key: str) -> bool:
+        """Check the state database for a submission of the media within the dedup TTL."""
+        try:
+            submission = await self.state.get_submission(media_key)
+        except BaseException:
+            self.seen_media.discard(media_key)
+            raise
+        if submission is None:
+            return False
+        ttl = self.seen_media.ttl
+        return not ttl or time.time() - submission["submitted_at"] < ttl
+    
+    def _forget_media(self, url: str):
+        """Let a repost of media whose download failed be submitted again."""
+        if self.seen_media is not None:
+            media_key = canonical_url_key(url)
+            self.seen_media.discard(media_key)
+            self.state.forget_media(media_key)
+    
+    def _record_submission(self, result: TaskResult, url: str, destination: str,
+                           channel_id: int, message_id: int):
+        """Persist a successful submission and start following its task."""
+        self.metrics.tasks_created.inc()
+        self.state.record_submission(url, message_id, destination, result.task_id,
+                                     canonical_url_key(url))
+        if result.task_id and self.config.task_tracking_enabled and self.live:
+            self.task_tracker.track(result.task_id, (channel_id, message_id, url))
+    
+    async def _submit_spooled(self, record: Dict[str, Any]) -> bool:
+        """
+        Replay a spooled submission.
+        
+        Returns:
+            False if the NAS is still unreachable and the record must stay
+            spooled, True once the NAS has accepted or rejected it
+        """
+        url = record["url"]
+        result = await self.submitter.submit(url, record["destination"])
+        if result.unreachable:
+            return False
+        
+        if result:
+            logger.info(f"Successfully queued spooled download: {url}",
+                        extra={**SAMPLED, "message_id": record["message_id"],
+                               "task_id": result.task_id, "url": url})
+            self._record_submission(result, url, record["destination"],
+                                    record["channel_id"], record["message_id"])
+        else:
+            logger.error(f"Failed to queue spooled download: {url}")
+            self.metrics.tasks_failed.labels("submit").inc()
+            self._forget_media(url)
+        
+        if record.get("react"):
+            self.reaction_scheduler.set_status(record["channel_id"], record["message_id"],
+                                               STATUS_QUEUED if result else STATUS_FAILED)
+        return True
+    
+    async def _on_task_finished(self, task_id: str, status: str, context: Any):
+        """Report a download task that reached a final state on the NAS."""
+        channel_id, message_id, url = context
+        log_context = {"channel_id": channel_id, "message_id": message_id,
+                       "task_id": task_id, "url": url}
+        
+        if status not in FAILED_STATUSES:
+            logger.info(f"Download finished ({status}): {url}", extra={**log_context, **SAMPLED})
+            return
+        
+        logger.error(f"Download task {task_id} failed on the NAS ({status}): {url}",
+                     extra=log_context)
+        self.metrics.tasks_failed.labels("download").inc()
+        self._forget_media(url)
+        
+        # The ✅ only meant "queued"; mark the message as failed
+        self.reaction_scheduler.set_status(channel_id, message_id, STATUS_FAILED)
     
     async def close(self):
         """Clean up when bot is shutting down."""
         logger.info("Shutting down Discord Showcase Loader...")
         
+        if self._catch_up_task is not None:
+            self._catch_up_task.cancel()
+            await asyncio.gather(self._catch_up_task, return_exceptions=True)
+        
+        if self.recorder is not None:
+            await self.recorder.stop()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        
+        # Stop the workers before the NAS session goes away
+        await self.pipeline.stop()
+        await self.task_tracker.stop()
+        
+        # Stop replaying and make sure every spooled submission is on disk
+        if self.spool is not None:
+            logger.info(f"Submission spool stats: {self.spool.stats()}")
+            await self.spool.close()
+        
+        # Send any batched submissions before logging out
+        await self.submitter.flush()
+        
+        # Give queued reactions a moment while the Discord session is still up
+        await self.reaction_scheduler.close()
+        logger.info(f"Reaction stats: {self.reaction_scheduler.stats()}")
+        
+        usage = self.processed_messages.memory_usage()
+        logger.info(f"Processed message tracker: {usage['channels']} channel(s), "
+                    f"{usage['tracked_ids']} ID(s), ~{usage['bytes']} bytes")
+        if self.seen_media is not None:
+            logger.info(f"Skipped {self.seen_media.hits} repost(s), "
+                        f"{len(self.seen_media)} media URL(s) remembered")
+        
+        logger.info(f"Synology client stats: {self.synology.stats()}")
+        
+        if self.loop_watchdog is not None:
+            await self.loop_watchdog.stop()
+            logger.info(f"Event loop watchdog stats: {self.loop_watchdog.stats()}")
+        
         # Logout from Synology NAS
         if self.synology.session_id:
             await self.synology.logout()
+        await self.synology.close()
+        
+        # Write any buffered state before exiting
+        await self.state.close()
             
         await super().close()
 
@@ -250,5 +684,41 @@ async def main():
             await bot.close()
 
 
+async def archive_main(channel_ids: List[int], since: Optional[str] = None) -> bool:
+    """
+    Archive the media of whole channels without processing live messages.
+    
+    Args:
+        channel_ids: Channels to archive
+        since: Optional start point, a message ID or ISO date
+        
+    Returns:
+        True if every channel was archived, False otherwise
+    """
+    since_id = parse_since(since)
+    bot = DiscordShowcaseLoader(live=False)
+    archiver = ChannelArchiver(bot, checkpoint_every=config.backfill_checkpoint_every)
+    success = True
+    
+    try:
+        # Logging in runs setup_hook (NAS login, workers); history only needs REST
+        await bot.login(config.discord_token)
+        if bot.is_closed():
+            return False
+        
+        for channel_id in channel_ids:
+            channel = await bot.fetch_channel(channel_id)
+            try:
+                await archiver.archive(channel, since_id)
+            except Exception as e:
+                logger.error(f"Archive of channel {channel_id} failed: {str(e)}")
+                success = False
+    finally:
+        if not bot.is_closed():
+            await bot.close()
+    
+    return success
+
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,161 @@
+"""
+Lean gateway mode for Discord Showcase Loader.
+
+discord.py turns every MESSAGE_CREATE of every channel the bot can see into a
+full discord.Message, keeps the last 1000 in its message cache and caches the
+authors, members and guild state they reference. The bot only reads a handful
+of fields of messages in its monitored channels. In lean mode the raw payload
+of a monitored channel is turned straight into a CompactMessage holding just
+those fields, and messages of other channels are dropped before anything is
+built. Only messages that may be commands still go through discord.py.
+"""
+import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import discord
+from discord.message import convert_emoji_reaction
+from discord.utils import snowflake_time
+
+# Event dispatched with each CompactMessage; handled by ``on_lean_message``
+LEAN_MESSAGE_EVENT = "lean_message"
+
+
+def lean_intents() -> discord.Intents:
+    """Return the only intents the bot needs."""
+    intents = discord.Intents.none()
+    intents.guilds = True  # Channel names, used for destination folders
+    intents.guild_messages = True  # MESSAGE_CREATE in guild channels
+    intents.message_content = True  # Content and attachments of those messages
+    return intents
+
+
+def lean_client_options() -> Dict[str, Any]:
+    """Return discord.py client options that turn off unused caches."""
+    return {
+        "intents": lean_intents(),
+        "max_messages": None,
+        "chunk_guilds_at_startup": False,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+    }
+
+
+class CompactChannel:
+    """The ID and name of a message's channel."""
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, channel_id: int, name: str):
+        self.id = channel_id
+        self.name = name
+
+
+class CompactAuthor:
+    """The author fields the bot reads."""
+
+    __slots__ = ("id", "name", "display_name")
+
+    def __init__(self, author_id: int, name: str, display_name: str):
+        self.id = author_id
+        self.name = name
+        self.display_name = display_name
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CompactAttachment:
+    """The filename, URL and size of an attachment."""
+
+    __slots__ = ("filename", "url", "size")
+
+    def __init__(self, filename: str, url: str, size: Optional[int] = None):
+        self.filename = filename
+        self.url = url
+        self.size = size
+
+
+class CompactMessage:
+    """
+    The parts of a message the bot reads, built directly from a gateway payload.
+
+    Offers the same attributes as discord.Message for those parts, so the
+    bot's message handling works with either.
+    """
+
+    __slots__ = ("_state", "id", "channel", "author", "content", "attachments")
+
+    def __init__(self, state: Any, message_id: int, channel: CompactChannel, author: CompactAuthor,
+                 content: str, attachments: Tuple[CompactAttachment, ...]):
+        self._state = state
+        self.id = message_id
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.attachments = attachments
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        """When the message was sent, from its snowflake."""
+        return snowflake_time(self.id)
+
+    async def add_reaction(self, emoji: str):
+        """React to the message."""
+        await self._state.http.add_reaction(self.channel.id, self.id, convert_emoji_reaction(emoji))
+
+
+def compact_message(state: Any, data: Dict[str, Any],
+                    channel_name: Optional[str] = None) -> CompactMessage:
+    """
+    Build a CompactMessage from a MESSAGE_CREATE payload.
+
+    Args:
+        state: discord.py connection state, used for the channel name and reactions
+        data: Gateway payload
+        channel_name: Channel name to use instead of looking it up
+
+    Returns:
+        The compact message
+    """
+    channel_id = int(data["channel_id"])
+    if channel_name is None:
+        channel_name = getattr(state.get_channel(channel_id), "name", None) or str(channel_id)
+
+    author = data.get("author") or {}
+    name = author.get("username", "")
+    nick = (data.get("member") or {}).get("nick")
+
+    return CompactMessage(
+        state,
+        int(data["id"]),
+        CompactChannel(channel_id, channel_name),
+        CompactAuthor(int(author.get("id", 0)), name, nick or author.get("global_name") or name),
+        data.get("content", ""),
+        tuple(CompactAttachment(attachment["filename"], attachment["url"], attachment.get("size"))
+              for attachment in data.get("attachments", ()))
+    )
+
+
+def install_lean_parser(state: Any, channel_ids: Iterable[int], command_prefix: str):
+    """
+    Replace the MESSAGE_CREATE parser of a discord.py connection state.
+
+    Messages in monitored channels are dispatched as ``lean_message`` events
+    with a CompactMessage. Messages starting with the command prefix are
+    also passed to discord.py's parser so commands keep working; every other
+    message is dropped without being parsed or cached.
+
+    Args:
+        state: discord.py connection state
+        channel_ids: Monitored channels
+        command_prefix: Prefix of the bot's commands
+    """
+    parse = state.parsers["MESSAGE_CREATE"]
+    monitored = {str(channel_id) for channel_id in channel_ids}
+
+    def parse_lean(data: Dict[str, Any]):
+        if data.get("channel_id") in monitored:
+            state.dispatch(LEAN_MESSAGE_EVENT, compact_message(state, data))
+        if data.get("content", "").startswith(command_prefix):
+            parse(data)
+
+    state.parsers["MESSAGE_CREATE"] = parse_lean
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+End-to-end load generator for Discord Showcase Loader.
+
+Feeds synthetic messages into DiscordShowcaseLoader.on_message at a target
+rate, without a gateway connection, while the NAS side talks to the local
+mock NAS. Reports end-to-end latency percentiles, peak queue depth, NAS calls
+per message and event loop lag as JSON. Instead of synthetic traffic, a
+gateway recording (see recorder.py) can be replayed at its original pace,
+faster, or as fast as possible.
+
+Usage:
+    python loadgen.py --rate 200 --duration 30
+    python loadgen.py --rate 500 --mock-args="--latency 0.02" --output run.json
+    python loadgen.py --nas 127.0.0.1:5000   # use an already running mock NAS
+    python loadgen.py --replay gateway.jsonl.gz --speed 10
+    python loadgen.py --repost-rate 0.3   # re-share earlier attachments under fresh URLs
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shlex
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import discord
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import discord_showcase_loader
+from discord_showcase_loader import DiscordShowcaseLoader
+from lean_gateway import compact_message
+from pipeline import DownloadJob
+from recorder import read_recording, replay
+
+logger = logging.getLogger("loadgen")
+
+# Share of synthetic messages of each kind, roughly what a showcase channel sees
+MESSAGE_MIX = (
+    ("text", 0.55),
+    ("attachment", 0.20),
+    ("attachments", 0.10),
+    ("direct_link", 0.10),
+    ("hosted_link", 0.05),
+)
+
+WORDS = ("look", "at", "this", "new", "render", "wip", "progress", "final", "version",
+         "thoughts", "feedback", "please", "lighting", "pass", "color", "grade")
+
+MEDIA_NAMES = ("render.png", "screenshot.jpg", "clip.mp4", "concept.webp", "turntable.gif",
+               "breakdown.mov")
+
+HOSTED_LINKS = (
+    "https://www.youtube.com/watch?v={}",
+    "https://youtu.be/{}",
+    "https://imgur.com/a/{}",
+    "https://vimeo.com/{}",
+)
+
+
+class SyntheticUser:
+    """Stand-in for a Discord user."""
+
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SyntheticChannel:
+    """Stand-in for a text channel."""
+
+    def __init__(self, channel_id: int, name: str):
+        self.id = channel_id
+        self.name = name
+
+
+class SyntheticAttachment:
+    """Stand-in for a message attachment on the Discord CDN."""
+
+    def __init__(self, channel_id: int, attachment_id: int, filename: str, rng: random.Random,
+                 host: str = "cdn.discordapp.com"):
+        self.id = attachment_id
+        self.channel_id = channel_id
+        self.filename = filename
+        self.size = 100_000 + attachment_id % 8_000_000
+        self.url = (f"https://{host}/attachments/{channel_id}/{attachment_id}/{filename}"
+                    f"?ex={rng.getrandbits(32):08x}&is={rng.getrandbits(32):08x}"
+                    f"&hm={rng.getrandbits(128):032x}&")
+
+
+class SyntheticMessage:
+    """Stand-in for discord.Message with the attributes the bot reads."""
+
+    def __init__(self, state: Any, message_id: int, channel: SyntheticChannel,
+                 author: SyntheticUser, content: str, attachments: List[SyntheticAttachment]):
+        self._state = state
+        self.id = message_id
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.attachments = attachments
+        self.created_at = datetime.now(timezone.utc)
+
+    async def add_reaction(self, emoji: str):
+        await self._state.http.add_reaction(self.channel.id, self.id, emoji)
+
+
+class MessageFactory:
+    """Builds synthetic messages with a realistic mix of attachments and links."""
+
+    def __init__(self, state: Any, channel_ids: List[int], seed: int = 0, repost_rate: float = 0.0):
+        self.state = state
+        self.random = random.Random(seed)
+        self.repost_rate = repost_rate
+        self.recent: List[SyntheticAttachment] = []
+        self.channels = [SyntheticChannel(channel_id, f"showcase-{index}")
+                         for index, channel_id in enumerate(channel_ids)]
+        self.authors = [SyntheticUser(10_000 + index, f"artist_{index}") for index in range(50)]
+        self.next_id = discord.utils.time_snowflake(datetime.now(timezone.utc))
+        self.kinds = [kind for kind, _ in MESSAGE_MIX]
+        self.weights = [weight for _, weight in MESSAGE_MIX]
+
+    def _snowflake(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def _text(self, words: int) -> str:
+        return " ".join(self.random.choice(WORDS) for _ in range(words))
+
+    def _attachment(self, channel: SyntheticChannel) -> SyntheticAttachment:
+        """A new attachment, or an earlier one shared again with a fresh signed URL."""
+        if self.recent and self.random.random() < self.repost_rate:
+            original = self.random.choice(self.recent)
+            host = self.random.choice(("cdn.discordapp.com", "media.discordapp.net"))
+            return SyntheticAttachment(original.channel_id, original.id, original.filename,
+                                       self.random, host)
+        attachment = SyntheticAttachment(channel.id, self._snowflake(),
+                                         self.random.choice(MEDIA_NAMES), self.random)
+        self.recent.append(attachment)
+        if len(self.recent) > 1000:
+            self.recent.pop(0)
+        return attachment
+
+    def build(self) -> SyntheticMessage:
+        """Return the next synthetic message."""
+        channel = self.random.choice(self.channels)
+        author = self.random.choice(self.authors)
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        content = self._text(self.random.randint(0, 20))
+        attachments = []
+
+        if kind == "attachment":
+            attachments.append(self._attachment(channel))
+        elif kind == "attachments":
+            for _ in range(self.random.randint(2, 4)):
+                attachments.append(self._attachment(channel))
+        elif kind == "direct_link":
+            name = self.random.choice(MEDIA_NAMES)
+            content += f" https://example.com/media/{self._snowflake()}/{name}"
+        elif kind == "hosted_link":
+            link = self.random.choice(HOSTED_LINKS).format(f"{self.random.getrandbits(40):x}")
+            content += f" {link}"
+
+        return SyntheticMessage(self.state, self._snowflake(), channel, author, content, attachments)
+
+
+class ReplayedChannel(discord.Object):
+    """Channel of a replayed message, named as it was when recorded."""
+
+    def __init__(self, channel_id: int, name: Optional[str]):
+        super().__init__(channel_id)
+        self.name = name or str(channel_id)
+
+
+def build_replayed(state: Any, record: Dict[str, Any], lean: bool = False) -> Any:
+    """Turn a recorded gateway payload back into a discord.Message, or a compact one in lean mode."""
+    data = record["d"]
+    if lean:
+        return compact_message(state, data, record.get("channel_name") or data["channel_id"])
+    channel = ReplayedChannel(int(data["channel_id"]), record.get("channel_name"))
+    return discord.Message(state=state, channel=channel, data=data)
+
+
+class InstrumentedLoader(DiscordShowcaseLoader):
+    """DiscordShowcaseLoader that records how long each message takes to be submitted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent_at: Dict[int, float] = {}
+        self.latencies: List[float] = []
+        self.media_messages = 0
+        self.urls = 0
+        self.outstanding = 0
+        self.drained = asyncio.Event()
+
+    def _extract_media_urls(self, message: Any) -> List[str]:
+        media_urls = super()._extract_media_urls(message)
+        if media_urls:
+            # This message will become a pipeline job
+            self.media_messages += 1
+            self.urls += len(media_urls)
+            self.outstanding += 1
+            self.drained.clear()
+        else:
+            self.sent_at.pop(message.id, None)
+        return media_urls
+
+    async def _process_job(self, job: DownloadJob):
+        try:
+            await super()._process_job(job)
+        finally:
+            sent = self.sent_at.pop(job.message_id, None)
+            if sent is not None:
+                self.latencies.append(time.perf_counter() - sent)
+            self.outstanding -= 1
+            if self.outstanding <= 0:
+                self.drained.set()
+
+
+def percentiles(values: List[float], scale: float = 1000.0) -> Dict[str, Optional[float]]:
+    """Return p50/p95/p99/max of a sample (nearest rank), scaled to milliseconds."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(p * len(ordered))) - 1))
+        return round(ordered[index] * scale, 3)
+
+    return {"p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99),
+            "max": round(ordered[-1] * scale, 3)}
+
+
+class LoopMonitor:
+    """Samples event loop lag and pipeline queue depth."""
+
+    def __init__(self, bot: InstrumentedLoader, interval: float = 0.01):
+        self.bot = bot
+        self.interval = interval
+        self.lags: List[float] = []
+        self.peak_queue_depth = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            self.peak_queue_depth = max(self.peak_queue_depth, self.bot.pipeline.qsize())
+
+
+async def fetch_mock_stats(session: aiohttp.ClientSession, base_url: str) -> Dict[str, Any]:
+    """Read the mock NAS counters."""
+    async with session.get(f"{base_url}/mock/stats") as response:
+        return await response.json()
+
+
+async def start_mock(host: str, port: int, extra_args: str) -> asyncio.subprocess.Process:
+    """Start the mock NAS in its own process so it does not share our event loop."""
+    runner = Path(__file__).parent / "run.py"
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(runner), "mock-nas", "--host", host, "--port", str(port),
+        *shlex.split(extra_args),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+    )
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            await asyncio.sleep(0.1)
+            if process.returncode is not None:
+                raise RuntimeError(f"Mock NAS exited with status {process.returncode}, "
+                                   f"is port {port} already in use?")
+            try:
+                await fetch_mock_stats(session, f"http://{host}:{port}")
+                return process
+            except aiohttp.ClientError:
+                pass
+    process.terminate()
+    raise RuntimeError("Mock NAS did not start")
+
+
+def configure(host: str, port: int, channel_ids: List[int], workdir: str):
+    """Point the bot's configuration at the mock NAS and throwaway state files."""
+    config = discord_showcase_loader.config
+    config.discord_token = config.discord_token or "loadgen"
+    config.channel_ids = channel_ids
+    config.synology_host = host
+    config.synology_port = port
+    config.synology_use_https = False
+    config.synology_username = "admin"
+    config.synology_password = "admin"
+    config.state_db_path = str(Path(workdir) / "state.db")
+    config.pipeline_spill_file = str(Path(workdir) / "spill.jsonl")
+    config.spool_path = str(Path(workdir) / "spool.jsonl")
+    config.backfill_enabled = False
+    config.gateway_record_file = ""
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one load test and return its report."""
+    if args.nas:
+        host, _, port_text = args.nas.partition(":")
+        port = int(port_text or 5000)
+        mock = None
+    else:
+        host, port = "127.0.0.1", args.mock_port
+        mock = await start_mock(host, port, args.mock_args)
+
+    records = None
+    if args.replay:
+        records = list(read_recording(args.replay))
+        channel_ids = sorted({int(record["d"]["channel_id"]) for record in records})
+    else:
+        channel_ids = [900_000_000_000_000_000 + index for index in range(args.channels)]
+
+    workdir = tempfile.mkdtemp(prefix="loadgen-")
+    configure(host, port, channel_ids, workdir)
+    base_url = f"http://{host}:{port}"
+
+    http = aiohttp.ClientSession()
+    bot = InstrumentedLoader()
+    monitor_task = None
+    try:
+        await bot.setup_hook()
+        if bot.is_closed():
+            raise RuntimeError("Bot failed to start, see the log for details")
+        bot._connection.user = SyntheticUser(1, "loader", bot=True)
+        reactions = Counter()
+
+        async def add_reaction(channel_id: int, message_id: int, emoji: str):
+            # Never talk to Discord; count the reactions the bot would add
+            reactions[emoji] += 1
+
+        async def remove_own_reaction(channel_id: int, message_id: int, emoji: str):
+            # Superseded statuses are taken down, so the counts are final statuses
+            reactions[emoji] -= 1
+
+        bot.http.add_reaction = add_reaction
+        bot.http.remove_own_reaction = remove_own_reaction
+
+        monitor = LoopMonitor(bot)
+        monitor_task = asyncio.create_task(monitor.run())
+        nas_before = await fetch_mock_stats(http, base_url)
+
+        handlers = set()
+
+        lean = bot.config.lean_gateway
+        handler = bot.on_lean_message if lean else bot.on_message
+
+        def dispatch(message: Any):
+            bot.sent_at[message.id] = time.perf_counter()
+            # The gateway dispatches every event in its own task
+            task = asyncio.create_task(handler(message))
+            handlers.add(task)
+            task.add_done_callback(handlers.discard)
+
+        started = time.perf_counter()
+        if records is not None:
+            speed = 0.0 if args.speed == "max" else float(args.speed)
+            total = await replay(records,
+                                 lambda record: dispatch(build_replayed(bot._connection, record, lean)),
+                                 speed=speed)
+        else:
+            factory = MessageFactory(bot._connection, channel_ids, seed=args.seed,
+                                     repost_rate=args.repost_rate)
+            total = int(args.rate * args.duration)
+            for index in range(total):
+                delay = started + index / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                dispatch(factory.build())
+
+        sent_elapsed = time.perf_counter() - started
+        if handlers:
+            await asyncio.gather(*handlers, return_exceptions=True)
+        if bot.outstanding > 0:
+            try:
+                await asyncio.wait_for(bot.drained.wait(), timeout=args.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{bot.outstanding} message(s) still queued after {args.drain_timeout}s")
+        await bot.submitter.flush()
+        elapsed = time.perf_counter() - started
+        # Reactions are paced per channel and may still be queued
+        await bot.reaction_scheduler.close(timeout=args.drain_timeout)
+
+        nas_after = await fetch_mock_stats(http, base_url)
+        monitor_task.cancel()
+
+        calls = {api: count - nas_before["calls"].get(api, 0)
+                 for api, count in nas_after["calls"].items()
+                 if count - nas_before["calls"].get(api, 0)}
+        nas_calls = sum(calls.values())
+
+        return {
+            "config": {
+                "replay": args.replay,
+                "speed": args.speed if args.replay else None,
+                "rate": None if args.replay else args.rate,
+                "duration": None if args.replay else args.duration,
+                "channels": len(channel_ids),
+                "seed": None if args.replay else args.seed,
+                "pipeline_workers": bot.config.pipeline_workers,
+                "max_inflight": bot.config.synology_max_inflight,
+                "batch_window": bot.config.synology_batch_window,
+                "lean_gateway": bot.config.lean_gateway,
+                "mock_args": args.mock_args if mock else None,
+            },
+            "messages_sent": total,
+            "media_messages": bot.media_messages,
+            "urls": bot.urls,
+            "unfinished_messages": max(bot.outstanding, 0),
+            "send_rate": round(total / sent_elapsed, 1) if sent_elapsed > 0 else None,
+            "elapsed_s": round(elapsed, 3),
+            "latency_ms": percentiles(bot.latencies),
+            "peak_queue_depth": monitor.peak_queue_depth,
+            "nas_calls": nas_calls,
+            "nas_calls_by_api": calls,
+            "nas_calls_per_message": round(nas_calls / total, 4) if total else None,
+            "nas_calls_per_media_message": (round(nas_calls / bot.media_messages, 4)
+                                            if bot.media_messages else None),
+            "loop_lag_ms": percentiles(monitor.lags),
+            "loop_stalls": bot.loop_watchdog.stats() if bot.loop_watchdog is not None else None,
+            "reactions": dict(reactions),
+            "reaction_scheduler": bot.reaction_scheduler.stats(),
+            "reposts_skipped": bot.seen_media.hits if bot.seen_media is not None else None,
+            "synology_client": bot.synology.stats(),
+        }
+    finally:
+        if monitor_task is not None:
+            monitor_task.cancel()
+        await bot.close()
+        await http.close()
+        if mock is not None and mock.returncode is None:
+            mock.terminate()
+            await mock.wait()
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Replay synthetic Discord traffic through the bot")
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic to send")
+    parser.add_argument("--channels", type=int, default=4, help="number of monitored channels")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the message mix")
+    parser.add_argument("--repost-rate", type=float, default=0.0,
+                        help="share of attachments that re-share an earlier one under a new URL")
+    parser.add_argument("--replay", default=None,
+                        help="replay this gateway recording instead of synthetic traffic")
+    parser.add_argument("--speed", default="1",
+                        help="replay speed: 1 for real time, N for N times faster, or max")
+    parser.add_argument("--nas", default=None,
+                        help="host:port of a running mock NAS (default: start one)")
+    parser.add_argument("--mock-port", type=int, default=15000,
+                        help="port for the mock NAS started by the load generator")
+    parser.add_argument("--mock-args", default="",
+                        help="extra arguments for 'run.py mock-nas', e.g. \"--latency 0.02\"")
+    parser.add_argument("--drain-timeout", type=float, default=60.0,
+                        help="seconds to wait for queued messages after sending stops")
+    parser.add_argument("--log-level", default="WARNING", help="bot log level during the run")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    return parser.parse_args()
+
+
+def main():
+    """Run the load generator and print its report."""
+    args = parse_args()
+    logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
+
+    report = asyncio.run(run_load(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
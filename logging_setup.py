@@ -0,0 +1,122 @@
+"""
+Non-blocking logging setup for Discord Showcase Loader.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from typing import Any, Dict
+
+# Pass as ``extra`` (or merge into it) to mark a noisy per-URL INFO line for sampling
+SAMPLED: Dict[str, Any] = {"sample": True}
+
+# Record attributes copied into JSON lines when a log call provides them
+CONTEXT_FIELDS = ("channel_id", "message_id", "task_id", "url")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                  + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of records marked with ``sample``.
+
+    Sampling is deterministic: with a rate of 0.1 every tenth marked record
+    passes. Only INFO and lower records are sampled; warnings and errors
+    always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._credit = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not getattr(record, "sample", False):
+            return True
+        self._credit += self.rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records without formatting them.
+
+    The standard QueueHandler formats each record in the calling thread so
+    that it can be pickled. Records here stay in the process, so formatting
+    is left to the listener thread like the rest of the work.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO", log_file: str = "", json_format: bool = False,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  sample_rate: float = 1.0) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background thread.
+
+    The event loop thread only appends records to an in-memory queue.
+    Formatting, the console and the size-rotated log file are handled by a
+    QueueListener thread, which is stopped (and drained) at exit.
+
+    Args:
+        level: Root log level name
+        log_file: Log file path (empty for console only)
+        json_format: Write JSON lines instead of plain text
+        max_bytes: Rotate the log file at this size (0 to never rotate)
+        backup_count: Number of rotated log files kept
+        sample_rate: Fraction of per-URL INFO lines (marked with SAMPLED) kept
+
+    Returns:
+        The running listener
+    """
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if sample_rate < 1.0:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
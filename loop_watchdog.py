@@ -0,0 +1,123 @@
+"""
+Event loop lag watchdog for Discord Showcase Loader.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames of the asyncio machinery itself, left out of captured stacks
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__) + os.sep
+
+
+class LoopWatchdog:
+    """
+    Measures event loop scheduling lag and reports what blocked the loop.
+
+    A task on the loop sleeps for ``interval`` and measures how late it
+    wakes up; the difference is the lag, passed to ``on_lag`` (e.g. a
+    histogram). The task also leaves a heartbeat. A watcher thread checks
+    the heartbeat, and when the loop has not come back ``threshold`` seconds
+    after it should have, captures the stack of the loop thread while it is
+    still blocked. Once the loop recovers the stall is logged as a warning
+    with its duration and that stack, so blocking calls are found without
+    reading the code.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.1,
+                 on_lag: Optional[Callable[[float], None]] = None, stack_limit: int = 25):
+        """
+        Initialize the watchdog.
+
+        Args:
+            threshold: Lag in seconds that counts as a stall
+            interval: Seconds between lag measurements
+            on_lag: Called on the loop with every measured lag in seconds
+            stack_limit: Innermost frames kept in a captured stack
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.on_lag = on_lag
+        self.stack_limit = stack_limit
+
+        self.stalls = 0
+        self.max_lag = 0.0
+
+        self._heartbeat = time.monotonic()
+        self._captured_beat = 0.0
+        self._stack: Optional[str] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self):
+        """Start measuring on the running loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching for event loop stalls over {self.threshold * 1000:.0f} ms")
+
+    async def stop(self):
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Return stall statistics."""
+        return {"stalls": self.stalls, "max_lag_ms": round(self.max_lag * 1000, 1)}
+
+    async def _measure(self):
+        """Measure lag and report stalls (loop)."""
+        while True:
+            beat = self._heartbeat
+            expected = beat + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - expected)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if self.on_lag is not None:
+                self.on_lag(lag)
+
+            if lag >= self.threshold:
+                self.stalls += 1
+                stack = self._stack if self._captured_beat == beat else None
+                if stack:
+                    logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms, "
+                                   f"loop thread was at:\n{stack}")
+                else:
+                    logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+    def _watch(self):
+        """Capture the loop thread's stack while it is blocked (watcher thread)."""
+        while not self._stopping.wait(self.threshold / 2):
+            beat = self._heartbeat
+            if beat == self._captured_beat:
+                continue
+            if time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            frames = [entry for entry in traceback.extract_stack(frame, limit=self.stack_limit)
+                      if not entry.filename.startswith(_ASYNCIO_DIR)]
+            self._stack = "".join(traceback.format_list(frames))
+            self._captured_beat = beat
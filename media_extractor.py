@@ -0,0 +1,317 @@
+"""
+Media URL extraction for Discord Showcase Loader.
+
+All patterns are compiled once at import. Message content is scanned a single
+time to tokenize URLs; each URL is then handed to the resolver registered for
+its host and, failing that, classified by its file extension. Resolvers also
+map URLs to canonical keys, so the same media posted under different URLs
+can be recognized.
+"""
+import importlib
+import logging
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Media file extensions to look for
+MEDIA_EXTENSIONS = {
+    'images': {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.tiff', '.ico'},
+    'videos': {'.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv', '.m4v', '.3gp', '.ogv'}
+}
+
+ALL_MEDIA_EXTENSIONS = frozenset(ext for exts in MEDIA_EXTENSIONS.values() for ext in exts)
+
+# A URL token ends at whitespace or a character that cannot appear unescaped in a URL.
+# Group 1 is the whole token, group 2 its host.
+URL_TOKEN_RE = re.compile(
+    r'(https?://'
+    r'(?:[^\s<>"{}|\\^`\[\]/?#@]*@)?'  # optional credentials
+    r'([^\s<>"{}|\\^`\[\]/?#@:]*)'     # host
+    r'[^\s<>"{}|\\^`\[\]]*)',          # port, path, query and fragment
+    re.IGNORECASE
+)
+
+# Longest prefix of a URL token that ends in a media extension
+DIRECT_MEDIA_RE = re.compile(
+    r'.*\.(?:' + '|'.join(sorted(ext.lstrip('.') for ext in ALL_MEDIA_EXTENSIONS)) + r')',
+    re.IGNORECASE | re.DOTALL
+)
+
+class Resolver:
+    """
+    Decides which URLs of a site are media and what should be downloaded.
+
+    A resolver is registered for one or more hostnames and only sees URLs on
+    those hosts. The default implementation matches ``pattern`` against the
+    start of the URL and downloads the matched part, which drops trailing
+    tracking parameters and the like; subclasses can override ``resolve``
+    for anything more involved.
+    """
+
+    def __init__(self, kind: str, hosts: Iterable[str], pattern: Union[str, Pattern, None] = None):
+        """
+        Initialize the resolver.
+
+        Args:
+            kind: Name of the site, reported for every URL it accepts
+            hosts: Hostnames handled by the resolver; ``www.`` variants are
+                matched automatically
+            pattern: Regular expression for the media URLs of the site
+        """
+        self.kind = kind
+        self.hosts = tuple(host.lower() for host in hosts)
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern, re.IGNORECASE)
+        self.pattern = pattern
+
+    def resolve(self, url: str) -> Optional[str]:
+        """
+        Return the URL to download, or None if the URL is not media.
+
+        Args:
+            url: A URL token on one of the resolver's hosts
+        """
+        match = self.pattern.match(url)
+        return match.group(0) if match else None
+
+    def canonical(self, url: str) -> Optional[str]:
+        """
+        Return a key shared by every URL of the same media, if the site has one.
+
+        Args:
+            url: A URL on one of the resolver's hosts
+
+        Returns:
+            The key, or None to fall back to the normalized URL
+        """
+        return None
+
+
+class DiscordAttachmentResolver(Resolver):
+    """
+    Discord attachment links.
+
+    The same attachment is served from cdn.discordapp.com and
+    media.discordapp.net, with ``ex``/``is``/``hm`` signature parameters that
+    change every time the link is refreshed. Attachment IDs are unique, so
+    the ID and filename identify the file.
+    """
+
+    ATTACHMENT_RE = re.compile(r'/attachments/\d+/(\d+)/([^/?#]+)')
+
+    def canonical(self, url: str) -> Optional[str]:
+        match = self.ATTACHMENT_RE.search(urlsplit(url).path)
+        return f'discord:{match.group(1)}/{match.group(2)}' if match else None
+
+
+class YouTubeResolver(Resolver):
+    """YouTube videos, keyed by video ID whether linked through youtu.be or youtube.com."""
+
+    def canonical(self, url: str) -> Optional[str]:
+        parts = urlsplit(url)
+        if parts.hostname and parts.hostname.endswith('youtu.be'):
+            video_id = parts.path.strip('/').split('/')[0]
+        else:
+            video_id = parse_qs(parts.query).get('v', [''])[0]
+        return f'youtube:{video_id}' if video_id else None
+
+
+class DirectFileResolver(Resolver):
+    """Accepts links to media files on any host, up to the file extension."""
+
+    def __init__(self):
+        super().__init__('direct', (), DIRECT_MEDIA_RE)
+
+
+class ResolverRegistry:
+    """
+    Resolvers indexed by hostname.
+
+    Each URL costs one dictionary lookup on its host, however many sites are
+    registered. URLs whose host has no resolver, or whose resolver rejects
+    them, are offered to the fallback resolver for direct file links.
+    """
+
+    def __init__(self, fallback: Optional[Resolver] = None):
+        self.fallback = fallback
+        self._by_host: Dict[str, Resolver] = {}
+
+    def register(self, resolver: Resolver) -> Resolver:
+        """Register a resolver for its hosts, replacing any previous one, and return it."""
+        for host in resolver.hosts:
+            self._by_host[host] = resolver
+        return resolver
+
+    def unregister(self, host: str):
+        """Remove the resolver of a host."""
+        self._by_host.pop(host.lower(), None)
+
+    def lookup(self, host: str) -> Optional[Resolver]:
+        """Return the resolver for a host, if any."""
+        host = host.lower()
+        resolver = self._by_host.get(host)
+        if resolver is None and host.startswith('www.'):
+            resolver = self._by_host.get(host[4:])
+        return resolver
+
+    def hosts(self) -> List[str]:
+        """Return every registered hostname."""
+        return sorted(self._by_host)
+
+    def classify(self, token: str, host: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        Classify a URL token.
+
+        Args:
+            token: A URL as found by URL_TOKEN_RE
+            host: The token's host if already known
+
+        Returns:
+            A ``(kind, url)`` tuple where ``kind`` names the resolver that
+            accepted the URL, or None if the URL is not media. ``url`` is the
+            portion of the token that should be downloaded.
+        """
+        if host is None:
+            match = URL_TOKEN_RE.match(token)
+            host = match.group(2) if match else ''
+
+        resolver = self.lookup(host)
+        if resolver is not None:
+            url = resolver.resolve(token)
+            if url:
+                return resolver.kind, url
+
+        if self.fallback is not None:
+            url = self.fallback.resolve(token)
+            if url:
+                return self.fallback.kind, url
+
+        return None
+
+    def canonical_key(self, url: str) -> str:
+        """
+        Map a media URL to a key that is the same for every URL of the same media.
+
+        The resolver of the URL's host provides the key where it can (e.g. a
+        Discord attachment ID or a YouTube video ID). Otherwise the key is the
+        URL without its scheme, ``www.``, port, credentials and fragment.
+
+        Args:
+            url: A media URL, e.g. as returned by ``classify``
+
+        Returns:
+            The key
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        resolver = self.lookup(host)
+        if resolver is not None:
+            key = resolver.canonical(url)
+            if key:
+                return key
+
+        if host.startswith('www.'):
+            host = host[4:]
+        key = host + parts.path
+        return f'{key}?{parts.query}' if parts.query else key
+
+
+# Resolvers for common media hosting sites
+DEFAULT_REGISTRY = ResolverRegistry(fallback=DirectFileResolver())
+DEFAULT_REGISTRY.register(YouTubeResolver(
+    'youtube', ('youtube.com', 'youtu.be'),
+    r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[\w-]+'))
+DEFAULT_REGISTRY.register(Resolver(
+    'vimeo', ('vimeo.com',), r'https?://(?:www\.)?vimeo\.com/\d+'))
+DEFAULT_REGISTRY.register(Resolver(
+    'twitch', ('twitch.tv',), r'https?://(?:www\.)?twitch\.tv/\w+'))
+DEFAULT_REGISTRY.register(Resolver(
+    'imgur', ('imgur.com', 'i.imgur.com'),
+    r'https?://(?:i\.)?imgur\.com/\w+\.(?:jpg|jpeg|png|gif|webp)'))
+DEFAULT_REGISTRY.register(Resolver(
+    'reddit', ('reddit.com',), r'https?://(?:www\.)?reddit\.com/\w+'))
+DEFAULT_REGISTRY.register(DiscordAttachmentResolver(
+    'discord', ('discordapp.com', 'cdn.discordapp.com'),
+    r'https?://(?:cdn\.)?discordapp\.com/attachments/[\w/.-]+'))
+DEFAULT_REGISTRY.register(DiscordAttachmentResolver(
+    'discord', ('media.discordapp.net',), r'https?://media\.discordapp\.net/attachments/[\w/.-]+'))
+
+
+def register_resolver(resolver: Resolver) -> Resolver:
+    """
+    Add a resolver to the default registry.
+
+    Call this from a module listed in MEDIA_RESOLVER_MODULES to support a new
+    site without changing the bot.
+    """
+    return DEFAULT_REGISTRY.register(resolver)
+
+
+def load_resolver_modules(names: Iterable[str]) -> List[str]:
+    """
+    Import modules that register resolvers.
+
+    Args:
+        names: Importable module names
+
+    Returns:
+        The modules that were loaded; failures are logged and skipped
+    """
+    loaded = []
+    for name in names:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception as e:
+            logger.error(f"Could not load media resolver module {name}: {str(e)}")
+    return loaded
+
+
+def classify_url(token: str, host: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """Classify a URL token with the default registry (see ResolverRegistry.classify)."""
+    return DEFAULT_REGISTRY.classify(token, host)
+
+
+def canonical_url_key(url: str) -> str:
+    """Return the dedup key of a media URL with the default registry (see ResolverRegistry.canonical_key)."""
+    return DEFAULT_REGISTRY.canonical_key(url)
+
+
+def extract_urls(content: str, on_match: Optional[Callable[[str], None]] = None,
+                 registry: Optional[ResolverRegistry] = None) -> List[str]:
+    """
+    Extract media URLs from message text in a single pass.
+
+    Args:
+        content: Message content
+        on_match: Called with the kind of every media URL found, e.g. for metrics
+        registry: Resolvers to use (default: DEFAULT_REGISTRY)
+
+    Returns:
+        Media URLs in the order they appear, without duplicates
+    """
+    # Every URL contains a scheme separator; most chat messages do not
+    if not content or '://' not in content:
+        return []
+
+    classify = (registry or DEFAULT_REGISTRY).classify
+    media_urls = {}
+    for token, host in URL_TOKEN_RE.findall(content):
+        result = classify(token, host)
+        if result is not None:
+            media_urls[result[1]] = None
+            if on_match is not None:
+                on_match(result[0])
+
+    return list(media_urls)
+
+
+def is_media_file(filename: str) -> bool:
+    """Check if a filename represents a media file."""
+    if not filename:
+        return False
+
+    return os.path.splitext(filename.lower())[1] in ALL_MEDIA_EXTENSIONS
@@ -0,0 +1,285 @@
+"""
+Minimal Prometheus-compatible metrics for Discord Showcase Loader.
+
+Metrics are plain in-memory numbers: incrementing a counter or observing a
+histogram is a dictionary update and a bisect, with no locks, threads or
+allocations on the hot path. Gauges and counters that mirror state kept
+elsewhere are read through a callback only when the endpoint is scraped.
+"""
+import logging
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond extraction to slow NAS calls
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Event loop lag buckets in seconds; anything past the first few is a stall
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way the text exposition format expects."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a label set, e.g. ``{method="create"}``."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Common name, help text and label handling."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Return the child metric for a set of label values."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    """A single number."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count.
+
+    With ``func`` the value is read from the callback at scrape time, for
+    counts that are already kept elsewhere.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 func: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.func = func
+        self._value = _Value()
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        """Increase the unlabeled counter."""
+        self._value.value += amount
+
+    def _samples(self) -> List[str]:
+        if self.labelnames:
+            return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+                    for values, child in self._children.items()]
+        value = self.func() if self.func is not None else self._value.value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, optionally read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, func: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation)
+        self.func = func
+        self._value = _Value()
+
+    def set(self, value: float):
+        """Set the gauge."""
+        self._value.value = value
+
+    def _samples(self) -> List[str]:
+        value = self.func() if self.func is not None else self._value.value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram series."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """A distribution of observed values in fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._value = _HistogramValue(self.buckets)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """Record a value in the unlabeled histogram."""
+        self._value.observe(value)
+
+    def _series(self, values: Tuple[str, ...], series: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), series.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+        lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+    def _samples(self) -> List[str]:
+        if self.labelnames:
+            lines = []
+            for values, series in self._children.items():
+                lines.extend(self._series(values, series))
+            return lines
+        return self._series((), self._value)
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+class BotMetrics:
+    """The metrics exported by the bot."""
+
+    def __init__(self):
+        self.registry = Registry()
+        register = self.registry.register
+
+        self.messages_seen = register(Counter(
+            "dsl_messages_seen_total", "Messages received by the bot"))
+        self.urls_extracted = register(Counter(
+            "dsl_urls_extracted_total", "Media URLs extracted from messages", ["pattern"]))
+        self.tasks_created = register(Counter(
+            "dsl_tasks_created_total", "Download tasks created on the NAS"))
+        self.tasks_failed = register(Counter(
+            "dsl_tasks_failed_total", "Downloads that failed, when submitted or later on the NAS",
+            ["stage"]))
+        self.reactions = register(Counter(
+            "dsl_reactions_total", "Reactions added to messages", ["emoji"]))
+
+        self.extraction_seconds = register(Histogram(
+            "dsl_extraction_seconds", "Time to extract the media URLs of a message"))
+        self.nas_request_seconds = register(Histogram(
+            "dsl_nas_request_seconds", "Latency of NAS API requests", ["method"]))
+        self.message_queued_seconds = register(Histogram(
+            "dsl_message_queued_seconds",
+            "Time from receiving a message to all of its URLs being queued on the NAS"))
+        self.loop_lag_seconds = register(Histogram(
+            "dsl_event_loop_lag_seconds", "How late the event loop ran a scheduled timer",
+            buckets=LOOP_LAG_BUCKETS))
+
+    def gauge(self, name: str, documentation: str, func: Callable[[], float]):
+        """Export a value read from the bot at scrape time."""
+        self.registry.register(Gauge(name, documentation, func))
+
+    def counter(self, name: str, documentation: str, func: Callable[[], float]):
+        """Export a count kept elsewhere, read at scrape time."""
+        self.registry.register(Counter(name, documentation, func=func))
+
+
+class MetricsServer:
+    """Serves a registry at ``/metrics`` over HTTP."""
+
+    def __init__(self, registry: Registry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode("utf-8"),
+                            headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self):
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
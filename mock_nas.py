@@ -0,0 +1,301 @@
+"""
+Local stand-in for a Synology DSM Download Station, for testing and benchmarking.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# APIs advertised through SYNO.API.Info
+API_INFO = {
+    "SYNO.API.Info": {"path": "query.cgi", "minVersion": 1, "maxVersion": 1, "requestFormat": "JSON"},
+    "SYNO.API.Auth": {"path": "auth.cgi", "minVersion": 1, "maxVersion": 6, "requestFormat": "JSON"},
+    "SYNO.DownloadStation2.Task": {"path": "entry.cgi", "minVersion": 1, "maxVersion": 3,
+                                   "requestFormat": "JSON"},
+}
+
+# Download Station 2 status codes used for simulated tasks
+STATUS_WAITING = 1
+STATUS_DOWNLOADING = 2
+STATUS_FINISHED = 5
+STATUS_ERROR = 101
+
+
+class MockNAS:
+    """
+    In-memory imitation of the DSM web API used by SynologyDownloadStation.
+
+    Implements ``SYNO.API.Info`` discovery, ``SYNO.API.Auth`` login and
+    logout, and ``SYNO.DownloadStation2.Task`` create, list, get and delete,
+    answering with the same JSON shapes as DSM. Created tasks move from
+    waiting through downloading to finished (or error) over
+    ``task_duration`` seconds. Latency, transient failures, session expiry
+    (error 119) and permission errors (403) can be injected to exercise the
+    client's retry, session and circuit breaker handling.
+    """
+
+    def __init__(self, username: str = "admin", password: str = "admin",
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 http_error_rate: float = 0.0, forbidden_rate: float = 0.0,
+                 session_lifetime: Optional[float] = None, expiry_rate: float = 0.0,
+                 task_duration: float = 5.0, task_fail_rate: float = 0.0):
+        """
+        Initialize the mock NAS.
+
+        Args:
+            username: Account accepted by login
+            password: Password accepted by login
+            latency: Seconds added to every response
+            jitter: Random extra latency of up to this many seconds
+            error_rate: Fraction of API calls answered with DSM error 100
+            http_error_rate: Fraction of requests answered with HTTP 503
+            forbidden_rate: Fraction of task creations answered with error 403
+            session_lifetime: Seconds after which a session expires (default: never)
+            expiry_rate: Fraction of authenticated calls answered with error 119
+            task_duration: Seconds a created task takes to finish
+            task_fail_rate: Fraction of created tasks that end in an error
+        """
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.forbidden_rate = forbidden_rate
+        self.session_lifetime = session_lifetime
+        self.expiry_rate = expiry_rate
+        self.task_duration = task_duration
+        self.task_fail_rate = task_fail_rate
+
+        self.sessions: Dict[str, float] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request and error counters."""
+        return {
+            "calls": dict(self.calls),
+            "total_calls": sum(self.calls.values()),
+            "errors": dict(self.errors),
+            "sessions": len(self.sessions),
+            "tasks": len(self.tasks),
+        }
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application serving the DSM endpoints."""
+        app = web.Application()
+        app.router.add_get("/mock/stats", self._handle_stats)
+        app.router.add_route("*", "/webapi/{cgi:.+}", self._handle_api)
+        return app
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        """Report the mock's counters."""
+        return web.json_response(self.stats())
+
+    async def _handle_api(self, request: web.Request) -> web.Response:
+        """Dispatch a DSM API request on its api and method parameters."""
+        params: Dict[str, str] = dict(request.query)
+        if request.method == "POST":
+            params.update(await request.post())
+        api = params.get("api", "")
+        method = params.get("method", "")
+        self.calls[f"{api}.{method}"] += 1
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if random.random() < self.http_error_rate:
+            self.errors["http_503"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        if api == "SYNO.API.Info" and method == "query":
+            return self._success(self._api_info(params.get("query", "ALL")))
+        if api == "SYNO.API.Auth" and method == "login":
+            return self._login(params)
+        if api == "SYNO.API.Auth" and method == "logout":
+            self.sessions.pop(self._session_id(request, params), None)
+            return self._success()
+        if api != "SYNO.DownloadStation2.Task":
+            return self._error(102)
+
+        error = self._check_session(request, params)
+        if error:
+            return self._error(error)
+        if random.random() < self.error_rate:
+            return self._error(100)
+
+        if method == "create":
+            if request.method != "POST" or random.random() < self.forbidden_rate:
+                return self._error(403)
+            return self._create(params)
+        if method == "list":
+            return self._list(params)
+        if method == "get":
+            return self._get(params)
+        if method == "delete":
+            return self._delete(params)
+        return self._error(103)
+
+    def _success(self, data: Any = None) -> web.Response:
+        """Return a successful DSM response."""
+        body = {"success": True}
+        if data is not None:
+            body["data"] = data
+        return web.json_response(body)
+
+    def _error(self, code: int) -> web.Response:
+        """Return a failed DSM response; DSM reports errors with HTTP 200."""
+        self.errors[str(code)] += 1
+        return web.json_response({"success": False, "error": {"code": code}})
+
+    def _api_info(self, query: str) -> Dict[str, Any]:
+        """Describe the supported APIs."""
+        if query == "ALL":
+            return API_INFO
+        names = query.split(",")
+        return {name: info for name, info in API_INFO.items() if name in names}
+
+    def _login(self, params: Dict[str, str]) -> web.Response:
+        """Create a session for valid credentials."""
+        if params.get("account") != self.username or params.get("passwd") != self.password:
+            return self._error(400)
+        sid = uuid.uuid4().hex
+        self.sessions[sid] = time.monotonic()
+        response = self._success({"sid": sid})
+        response.set_cookie("id", sid)
+        return response
+
+    def _session_id(self, request: web.Request, params: Dict[str, str]) -> Optional[str]:
+        """Return the session ID sent as a cookie or ``_sid`` parameter."""
+        return request.cookies.get("id") or params.get("_sid")
+
+    def _check_session(self, request: web.Request, params: Dict[str, str]) -> Optional[int]:
+        """Return an error code if the request's session is missing or expired."""
+        sid = self._session_id(request, params)
+        if sid is None:
+            return 105
+        created = self.sessions.get(sid)
+        if created is None:
+            return 119
+        if ((self.session_lifetime is not None and time.monotonic() - created > self.session_lifetime)
+                or random.random() < self.expiry_rate):
+            del self.sessions[sid]
+            return 119
+        return None
+
+    def _create(self, params: Dict[str, str]) -> web.Response:
+        """Create one task per comma separated URI."""
+        uris = [uri.replace("%2C", ",") for uri in params.get("uri", "").split(",") if uri]
+        if not uris:
+            return self._error(101)
+
+        destination = params.get("destination", "")
+        task_ids = []
+        for uri in uris:
+            task_id = f"dbid_{uuid.uuid4().int % 10**9}"
+            self.tasks[task_id] = {
+                "id": task_id,
+                "uri": uri,
+                "destination": destination,
+                "created": time.time(),
+                "fails": random.random() < self.task_fail_rate,
+            }
+            task_ids.append(task_id)
+        return self._success({"task_id": task_ids, "list_id": []})
+
+    def _task_view(self, task: Dict[str, Any], additional: List[str]) -> Dict[str, Any]:
+        """Render a task the way Download Station reports it."""
+        elapsed = time.time() - task["created"]
+        progress = min(elapsed / self.task_duration, 1.0) if self.task_duration > 0 else 1.0
+        size = 10 * 1024 * 1024
+        if progress >= 1.0:
+            status = STATUS_ERROR if task["fails"] else STATUS_FINISHED
+        else:
+            status = STATUS_DOWNLOADING if progress > 0.1 else STATUS_WAITING
+
+        view = {
+            "id": task["id"],
+            "type": "https" if task["uri"].startswith("https") else "http",
+            "username": self.username,
+            "title": task["uri"].rstrip("/").rsplit("/", 1)[-1] or task["uri"],
+            "size": size,
+            "status": status,
+        }
+        extra = {}
+        if "detail" in additional:
+            extra["detail"] = {
+                "destination": task["destination"],
+                "uri": task["uri"],
+                "create_time": int(task["created"]),
+            }
+        if "transfer" in additional:
+            extra["transfer"] = {
+                "size_downloaded": int(size * progress),
+                "speed_download": int(size / self.task_duration) if progress < 1.0 else 0,
+            }
+        if extra:
+            view["additional"] = extra
+        return view
+
+    def _list(self, params: Dict[str, str]) -> web.Response:
+        """Return a page of tasks."""
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", -1))
+        additional = json.loads(params.get("additional", "[]"))
+        tasks = list(self.tasks.values())
+        page = tasks[offset:] if limit < 0 else tasks[offset:offset + limit]
+        return self._success({
+            "offset": offset,
+            "tasks": [self._task_view(task, additional) for task in page],
+            "total": len(tasks),
+        })
+
+    def _get(self, params: Dict[str, str]) -> web.Response:
+        """Return the requested tasks that exist."""
+        task_ids = json.loads(params.get("id", "[]"))
+        additional = json.loads(params.get("additional", "[]"))
+        return self._success({
+            "task": [self._task_view(self.tasks[task_id], additional)
+                     for task_id in task_ids if task_id in self.tasks],
+        })
+
+    def _delete(self, params: Dict[str, str]) -> web.Response:
+        """Delete tasks, reporting the IDs that did not exist."""
+        task_ids = json.loads(params.get("id", "[]"))
+        failed = [task_id for task_id in task_ids if self.tasks.pop(task_id, None) is None]
+        return self._success({"failed_task": [{"id": task_id, "error": 544} for task_id in failed]})
+
+
+async def start_mock_nas(nas: MockNAS, host: str = "127.0.0.1", port: int = 5000) -> web.AppRunner:
+    """
+    Serve a mock NAS in the running event loop.
+
+    Returns:
+        The runner; call ``cleanup()`` on it to stop serving
+    """
+    runner = web.AppRunner(nas.create_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Mock Synology NAS listening on http://{host}:{port}")
+    return runner
+
+
+async def run_mock_nas(nas: MockNAS, host: str = "127.0.0.1", port: int = 5000):
+    """Serve a mock NAS until cancelled."""
+    runner = await start_mock_nas(nas, host, port)
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        logger.info(f"Mock NAS stats: {nas.stats()}")
+        await runner.cleanup()
@@ -0,0 +1,302 @@
+"""
+Ingestion pipeline between Discord events and Synology submissions.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop-oldest", "spill")
+
+
+class MediaJob:
+    """
+    One media URL to submit, with everything later stages need.
+
+    Built once per URL when the message is read, so the Discord message
+    itself is not kept alive while the URL waits for a worker and the NAS.
+    Immutable.
+    """
+
+    __slots__ = ("channel_id", "message_id", "url", "destination", "filename", "size")
+
+    def __init__(self, channel_id: int, message_id: int, url: str, destination: str,
+                 filename: str, size: Optional[int] = None):
+        """
+        Initialize the job.
+
+        Args:
+            channel_id: Channel of the message the URL was found in
+            message_id: Message the URL was found in
+            url: Media URL to submit
+            destination: Download Station destination folder
+            filename: Descriptive filename for the download
+            size: Attachment size in bytes, if known
+        """
+        for name, value in zip(self.__slots__, (channel_id, message_id, url, destination, filename, size)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("MediaJob is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("MediaJob is immutable")
+
+    def __repr__(self) -> str:
+        return (f"MediaJob(channel_id={self.channel_id}, message_id={self.message_id}, "
+                f"url={self.url!r}, destination={self.destination!r}, "
+                f"filename={self.filename!r}, size={self.size})")
+
+
+class DownloadJob:
+    """Work item holding the media found in one Discord message."""
+
+    __slots__ = ("channel_id", "message_id", "media", "received")
+
+    def __init__(self, channel_id: int, message_id: int, media: Tuple[MediaJob, ...],
+                 received: Optional[float] = None):
+        """
+        Initialize the job.
+
+        Args:
+            channel_id: Channel of the message
+            message_id: Message the media was found in
+            media: One MediaJob per URL, in message order
+            received: time.perf_counter() when the message arrived (default: now)
+        """
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.media = media
+        self.received = time.perf_counter() if received is None else received
+
+    def to_record(self) -> Dict[str, Any]:
+        """Return a JSON-serializable reference to the job for spilling."""
+        return {
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+        }
+
+
+class IngestPipeline:
+    """
+    Bounded job queue drained by a pool of worker tasks.
+
+    Producers call ``put`` and return as soon as the job is queued. When the
+    queue is full the backpressure policy decides what happens:
+
+    - ``block``: wait until a worker frees a slot
+    - ``drop-oldest``: discard the oldest queued job to make room
+    - ``spill``: append the job to a file on disk; spilled jobs are restored
+      through ``restore`` once the queue has room again, including after a
+      restart
+
+    ``stop`` lets the workers finish the queue for up to ``drain_timeout``
+    seconds. With ``spill_path`` and ``restore`` set, whatever is still queued
+    or in progress after that is written to the spill file and restored on
+    the next start, whatever the policy.
+    """
+
+    def __init__(self, handler: Callable[[DownloadJob], Awaitable[None]],
+                 workers: int = 4, maxsize: int = 1000, policy: str = "block",
+                 spill_path: Optional[str] = None,
+                 restore: Optional[Callable[[Dict[str, Any]], Awaitable[Optional[DownloadJob]]]] = None,
+                 drain_timeout: float = 30.0):
+        """
+        Initialize the pipeline.
+
+        Args:
+            handler: Coroutine function that processes one job
+            workers: Number of concurrent worker tasks
+            maxsize: Maximum number of queued jobs
+            policy: Backpressure policy, one of BACKPRESSURE_POLICIES; anything
+                else falls back to ``block``
+            spill_path: File used by the ``spill`` policy and for jobs left at shutdown
+            restore: Rebuilds a job from a spilled record
+            drain_timeout: Seconds ``stop`` waits for queued jobs to be processed
+        """
+        # Config.validate reports bad settings; fall back instead of failing before it runs
+        if policy not in BACKPRESSURE_POLICIES:
+            logger.warning(f"Unknown backpressure policy '{policy}', using 'block'")
+            policy = "block"
+        if policy == "spill" and (not spill_path or restore is None):
+            logger.warning("The spill policy requires spill_path and restore, using 'block'")
+            policy = "block"
+
+        self.handler = handler
+        self.worker_count = max(1, workers)
+        self.policy = policy
+        self.spill_path = spill_path
+        self.restore = restore
+        self.drain_timeout = drain_timeout
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.spilled = 0
+
+        self._workers: List[asyncio.Task] = []
+        self._active: Dict[int, DownloadJob] = {}
+        self._stopping = False
+        self._spill_task: Optional[asyncio.Task] = None
+        self._spill_pending = asyncio.Event()
+        self._spill_lock = asyncio.Lock()
+
+    async def start(self):
+        """Start the worker pool (and the spill drainer if enabled)."""
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingest-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        self._stopping = False
+        if self.spill_path and self.restore is not None:
+            if os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) > 0:
+                logger.info(f"Found spilled jobs in {self.spill_path}, restoring")
+                self._spill_pending.set()
+            self._spill_task = asyncio.create_task(self._drain_spill(), name="ingest-spill")
+        logger.info(f"Started {self.worker_count} ingest worker(s) with '{self.policy}' backpressure")
+
+    async def put(self, job: DownloadJob):
+        """Queue a job, applying the backpressure policy if the queue is full."""
+        if self._stopping and self.spill_path and self.restore is not None:
+            # The workers may be gone before this job would be picked up
+            await self._spill([job.to_record()])
+            return
+
+        if self.policy == "block":
+            await self.queue.put(job)
+            return
+
+        try:
+            self.queue.put_nowait(job)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "drop-oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+                logger.warning("Ingest queue full, dropped oldest job")
+            except asyncio.QueueEmpty:
+                pass
+            self.queue.put_nowait(job)
+        else:
+            await self._spill([job.to_record()])
+            logger.warning("Ingest queue full, spilled job to disk")
+
+    def qsize(self) -> int:
+        """Return the number of jobs waiting in the queue."""
+        return self.queue.qsize()
+
+    async def stop(self):
+        """
+        Process the queued jobs, then stop the workers.
+
+        Messages are recorded as processed when they are queued, so a job
+        dropped here would never be fetched again. Jobs left after
+        ``drain_timeout`` are spilled if possible, otherwise logged.
+        """
+        self._stopping = True
+        if self._spill_task:
+            self._spill_task.cancel()
+            await asyncio.gather(self._spill_task, return_exceptions=True)
+            self._spill_task = None
+
+        if self._workers and (self.queue.qsize() or self._active):
+            logger.info(f"Waiting up to {self.drain_timeout}s for {self.queue.qsize()} queued job(s)")
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Jobs cancelled mid-way are retried as a whole
+        jobs = list(self._active.values())
+        self._active.clear()
+        while not self.queue.empty():
+            jobs.append(self.queue.get_nowait())
+            self.queue.task_done()
+        if not jobs:
+            return
+
+        if self.spill_path and self.restore is not None:
+            await self._spill([job.to_record() for job in jobs])
+            logger.warning(f"Spilled {len(jobs)} unprocessed job(s) on shutdown")
+        else:
+            logger.error(f"Shut down with {len(jobs)} unprocessed job(s), messages: "
+                         f"{', '.join(str(job.message_id) for job in jobs)}")
+
+    async def _worker(self, index: int):
+        """Process jobs from the queue until cancelled."""
+        while True:
+            job = await self.queue.get()
+            self._active[index] = job
+            try:
+                await self.handler(job)
+                del self._active[index]
+            except Exception as e:
+                del self._active[index]
+                logger.error(f"Ingest worker {index} failed to process job: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _spill(self, records: List[Dict[str, Any]]):
+        """Append records to the spill file."""
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        async with self._spill_lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._append_spill, lines)
+        self.spilled += len(records)
+        self._spill_pending.set()
+
+    def _append_spill(self, lines: str):
+        """Append lines to the spill file (runs in a worker thread)."""
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _take_spill(self) -> List[Dict[str, Any]]:
+        """Read and truncate the spill file (runs in a worker thread)."""
+        if not os.path.exists(self.spill_path):
+            return []
+        with open(self.spill_path, "r+", encoding="utf-8") as f:
+            lines = f.readlines()
+            f.seek(0)
+            f.truncate()
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping corrupt spill record: {line.strip()}")
+        return records
+
+    async def _drain_spill(self):
+        """Move spilled jobs back into the queue as capacity frees up."""
+        while True:
+            await self._spill_pending.wait()
+            async with self._spill_lock:
+                self._spill_pending.clear()
+                records = await asyncio.get_running_loop().run_in_executor(None, self._take_spill)
+
+            for index, record in enumerate(records):
+                try:
+                    job = await self.restore(record)
+                    if job is not None:
+                        # Blocking put: the drainer waits for room instead of re-spilling
+                        await self.queue.put(job)
+                except asyncio.CancelledError:
+                    # Keep the records that were not re-queued yet
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._append_spill,
+                        "".join(json.dumps(r) + "\n" for r in records[index:])
+                    )
+                    raise
+                except Exception as e:
+                    logger.error(f"Could not restore spilled job {record}: {str(e)}")
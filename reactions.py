@@ -0,0 +1,199 @@
+"""
+Coalescing reaction scheduler for Discord Showcase Loader.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Status reactions
+STATUS_QUEUED = '✅'
+STATUS_SPOOLED = '⏳'
+STATUS_FAILED = '❌'
+STATUS_ERROR = '⚠️'
+STATUS_REPOST = '♻️'
+
+# When several outcomes are known at once the most severe one is shown
+STATUS_PRIORITY = {STATUS_REPOST: 0, STATUS_QUEUED: 1, STATUS_SPOOLED: 2, STATUS_FAILED: 3,
+                   STATUS_ERROR: 4}
+
+
+def worst_status(statuses: Iterable[str]) -> str:
+    """Return the status that represents a set of outcomes, e.g. ❌ over ✅."""
+    return max(statuses, key=STATUS_PRIORITY.__getitem__)
+
+
+def merge_status(pending: str, newer: str) -> str:
+    """
+    Combine an earlier status, queued or already on the message, with a newer one.
+
+    ⏳ only means "not known yet", so any newer status replaces it; otherwise
+    the more severe status wins.
+    """
+    if pending == STATUS_SPOOLED:
+        return newer
+    return worst_status((pending, newer))
+
+
+class ReactionScheduler:
+    """
+    Keeps one status reaction per message, paced per channel.
+
+    ``set_status`` returns immediately. Each channel has its own queue of
+    messages waiting for a reaction, sent in order by one task per channel
+    with ``interval`` seconds between calls, matching Discord's per-channel
+    reaction rate limit. A status reported for a message that is still
+    queued is merged into the queued one instead of adding a call, and it is
+    merged with the status already on the message the same way, so ❌ or ⚠️
+    is never replaced by a milder status. Once a newer status has been added
+    to a message, the one it replaces is removed, so the message ends up with
+    its final status only; a status already on the message is not sent again.
+    A send that fails is queued again up to ``attempts`` times in total,
+    merged with any newer status that arrived meanwhile.
+    """
+
+    def __init__(self, send: Callable[[int, int, str], Awaitable[None]], interval: float = 0.25,
+                 max_tracked: int = 10000,
+                 remove: Optional[Callable[[int, int, str], Awaitable[None]]] = None,
+                 attempts: int = 3):
+        """
+        Initialize the scheduler.
+
+        Args:
+            send: Coroutine function adding a reaction: (channel_id, message_id, emoji);
+                raises if the reaction could not be added
+            interval: Seconds between reactions in the same channel
+            max_tracked: Messages whose applied reaction is remembered
+            remove: Coroutine function removing the bot's own reaction, with the
+                same arguments; superseded reactions are kept if not given
+            attempts: Times a reaction is sent before it is given up
+        """
+        self.send = send
+        self.remove = remove
+        self.interval = interval
+        self.max_tracked = max_tracked
+        self.attempts = max(1, attempts)
+
+        self.sent = 0
+        self.removed = 0
+        self.coalesced = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._pending: Dict[int, "OrderedDict[int, str]"] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._applied: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self._failures: Dict[Tuple[int, int], int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of messages waiting for a reaction."""
+        return sum(len(pending) for pending in self._pending.values())
+
+    def set_status(self, channel_id: int, message_id: int, emoji: str):
+        """Queue the status reaction of a message."""
+        pending = self._pending.get(channel_id)
+        if pending is None:
+            pending = self._pending[channel_id] = OrderedDict()
+
+        queued = pending.get(message_id)
+        if queued is not None:
+            pending[message_id] = merge_status(queued, emoji)
+            self.coalesced += 1
+        else:
+            pending[message_id] = emoji
+
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(
+                self._drain(channel_id), name=f"reactions-{channel_id}")
+
+    async def close(self, timeout: float = 5.0):
+        """Send queued reactions for up to ``timeout`` seconds, then drop the rest."""
+        deadline = time.monotonic() + timeout
+        while self._workers:
+            workers = list(self._workers.values())
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                await asyncio.wait(workers, timeout=remaining)
+                continue
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        dropped = len(self)
+        if dropped:
+            self.dropped += dropped
+            logger.warning(f"Dropped {dropped} unsent reaction(s) on shutdown")
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        """Return reaction statistics."""
+        return {
+            "sent": self.sent,
+            "removed": self.removed,
+            "coalesced": self.coalesced,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "pending": len(self),
+        }
+
+    async def _drain(self, channel_id: int):
+        """Send the queued reactions of one channel in order."""
+        try:
+            while True:
+                pending = self._pending.get(channel_id)
+                if not pending:
+                    self._pending.pop(channel_id, None)
+                    break
+                message_id, emoji = pending.popitem(last=False)
+                key = (channel_id, message_id)
+                applied = self._applied.get(key)
+                if applied is not None:
+                    emoji = merge_status(applied, emoji)
+                if applied == emoji:
+                    self.duplicates += 1
+                    continue
+
+                try:
+                    await self.send(channel_id, message_id, emoji)
+                except Exception as e:
+                    self._retry(channel_id, message_id, emoji, e)
+                    await asyncio.sleep(self.interval)
+                    continue
+
+                self.sent += 1
+                self._failures.pop(key, None)
+                self._applied[key] = emoji
+                self._applied.move_to_end(key)
+                if len(self._applied) > self.max_tracked:
+                    self._applied.popitem(last=False)
+                await asyncio.sleep(self.interval)
+
+                if applied is not None and self.remove is not None:
+                    # Take down the status this one replaces
+                    try:
+                        await self.remove(channel_id, message_id, applied)
+                        self.removed += 1
+                    except Exception as e:
+                        logger.warning(f"Could not remove {applied} from message {message_id}: {str(e)}")
+                    await asyncio.sleep(self.interval)
+        finally:
+            del self._workers[channel_id]
+
+    def _retry(self, channel_id: int, message_id: int, emoji: str, error: Exception):
+        """Queue a failed reaction again, merged with any newer status, unless it failed too often."""
+        key = (channel_id, message_id)
+        failures = self._failures.get(key, 0) + 1
+        pending = self._pending.get(channel_id)
+        if failures < self.attempts and pending is not None:
+            self._failures[key] = failures
+            newer = pending.get(message_id)
+            pending[message_id] = emoji if newer is None else merge_status(emoji, newer)
+            logger.warning(f"Could not react to message {message_id}, will retry: {str(error)}")
+            return
+        self._failures.pop(key, None)
+        self.failed += 1
+        logger.warning(f"Could not react to message {message_id}: {str(error)}")
@@ -0,0 +1,164 @@
+"""
+Recording of raw gateway message events for replaying real traffic offline.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values are credentials and must never be written to a recording
+SECRET_KEYS = frozenset({"token", "access_token", "refresh_token", "webhook_token"})
+
+
+def scrub(value: Any) -> Any:
+    """Return a copy of a gateway payload with every credential removed."""
+    if isinstance(value, dict):
+        return {key: scrub(item) for key, item in value.items() if key not in SECRET_KEYS}
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+class GatewayRecorder:
+    """
+    Writes raw MESSAGE_CREATE payloads of monitored channels to a recording.
+
+    The recorder wraps discord.py's MESSAGE_CREATE parser, so it sees the
+    gateway data before it becomes a discord.Message. The hot path only
+    appends the payload to a list; scrubbing, serialization and gzip
+    compression happen on a dedicated thread every ``flush_interval``
+    seconds. Each line holds the seconds since recording started (``t``),
+    the channel name (``channel_name``) and the payload (``d``). Every flush
+    appends a gzip member, so a crash loses at most the last interval.
+    """
+
+    def __init__(self, path: str, channel_ids: Iterable[int], flush_interval: float = 1.0):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Recording file, usually ending in .jsonl.gz
+            channel_ids: Channels whose messages are recorded
+            flush_interval: Seconds between writes to the file
+        """
+        self.path = path
+        self.channel_ids = {str(channel_id) for channel_id in channel_ids}
+        self.flush_interval = flush_interval
+        self.recorded = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")
+        self._buffer: List[tuple] = []
+        self._started = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def install(self, state: Any):
+        """Hook the MESSAGE_CREATE parser of a discord.py connection state."""
+        parse = state.parsers["MESSAGE_CREATE"]
+
+        def record_and_parse(data: Dict[str, Any]):
+            channel_id = data.get("channel_id")
+            if channel_id in self.channel_ids:
+                channel = state.get_channel(int(channel_id))
+                self._buffer.append((time.monotonic() - self._started,
+                                     getattr(channel, "name", None), data))
+            parse(data)
+
+        state.parsers["MESSAGE_CREATE"] = record_and_parse
+
+    async def start(self):
+        """Start writing in the background."""
+        self._started = time.monotonic()
+        self._flush_task = asyncio.create_task(self._flush_loop(), name="gateway-recorder")
+        logger.info(f"Recording gateway messages to {self.path}")
+
+    async def stop(self):
+        """Write everything recorded so far and stop."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        logger.info(f"Recorded {self.recorded} gateway message(s) to {self.path}")
+
+    async def flush(self):
+        """Write buffered payloads to the recording."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, batch)
+            self.recorded += len(batch)
+        except Exception as e:
+            logger.error(f"Gateway recording write error: {str(e)}")
+
+    def _write(self, batch: List[tuple]):
+        """Scrub, serialize and append a batch (recorder thread)."""
+        lines = "".join(
+            json.dumps({"t": round(offset, 6), "channel_name": name, "d": scrub(data)},
+                       separators=(",", ":")) + "\n"
+            for offset, name, data in batch
+        )
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def _flush_loop(self):
+        """Flush the buffer periodically."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+def read_recording(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a recording in order.
+
+    A recording cut short by a crash ends at its last complete record.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except (EOFError, zlib.error):
+            logger.warning(f"Recording {path} is truncated, replaying the complete part")
+
+
+async def replay(records: Iterable[Dict[str, Any]], deliver: Callable[[Dict[str, Any]], Any],
+                 speed: float = 1.0) -> int:
+    """
+    Deliver recorded events with their original spacing.
+
+    Args:
+        records: Records from read_recording()
+        deliver: Called with each record; may return an awaitable
+        speed: Time compression factor, e.g. 1 for real time, 10 for ten
+            times faster, or 0 to deliver as fast as possible
+
+    Returns:
+        Number of records delivered
+    """
+    count = 0
+    started = time.monotonic()
+    first = None
+    for record in records:
+        if first is None:
+            first = record["t"]
+        if speed > 0:
+            delay = started + (record["t"] - first) / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        result = deliver(record)
+        if asyncio.iscoroutine(result):
+            await result
+        count += 1
+        if speed <= 0 and count % 100 == 0:
+            # Let the handlers run between bursts
+            await asyncio.sleep(0)
+    return count
@@ -1,23 +1,91 @@
 #!/usr/bin/env python3
 """
 Simple runner script for Discord Showcase Loader
+
+Usage:
+    python run.py                                    # run the bot
+    python run.py archive --channel ID [--since X]   # archive channel history
+    python run.py mock-nas [--port 5000] [...]       # serve a local mock NAS
 """
 
 import sys
 import asyncio
+import argparse
 import logging
 from pathlib import Path
 
 # Add current directory to path to ensure local imports work
 sys.path.insert(0, str(Path(__file__).parent))
 
-from discord_showcase_loader import main
+from discord_showcase_loader import main, archive_main
+from mock_nas import MockNAS, run_mock_nas
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Discord Showcase Loader")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    subparsers.add_parser("bot", help="run the bot (default)")
+    
+    archive_parser = subparsers.add_parser("archive", help="archive the media of whole channels")
+    archive_parser.add_argument("--channel", type=int, action="append", required=True,
+                                help="channel ID to archive (repeatable)")
+    archive_parser.add_argument("--since", default=None,
+                                help="only archive after this message ID or ISO date")
+    
+    mock_parser = subparsers.add_parser("mock-nas", help="serve a local mock Synology NAS")
+    mock_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    mock_parser.add_argument("--port", type=int, default=5000, help="port to listen on")
+    mock_parser.add_argument("--username", default="admin", help="account accepted by login")
+    mock_parser.add_argument("--password", default="admin", help="password accepted by login")
+    mock_parser.add_argument("--latency", type=float, default=0.0,
+                             help="seconds added to every response")
+    mock_parser.add_argument("--jitter", type=float, default=0.0,
+                             help="random extra latency of up to this many seconds")
+    mock_parser.add_argument("--error-rate", type=float, default=0.0,
+                             help="fraction of API calls failing with DSM error 100")
+    mock_parser.add_argument("--http-error-rate", type=float, default=0.0,
+                             help="fraction of requests failing with HTTP 503")
+    mock_parser.add_argument("--forbidden-rate", type=float, default=0.0,
+                             help="fraction of task creations failing with error 403")
+    mock_parser.add_argument("--session-lifetime", type=float, default=None,
+                             help="seconds before a session expires with error 119")
+    mock_parser.add_argument("--expiry-rate", type=float, default=0.0,
+                             help="fraction of calls failing with error 119")
+    mock_parser.add_argument("--task-duration", type=float, default=5.0,
+                             help="seconds a created task takes to finish")
+    mock_parser.add_argument("--task-fail-rate", type=float, default=0.0,
+                             help="fraction of tasks that end in an error")
+    
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        if args.command == "archive":
+            success = asyncio.run(archive_main(args.channel, args.since))
+            sys.exit(0 if success else 1)
+        elif args.command == "mock-nas":
+            nas = MockNAS(
+                username=args.username,
+                password=args.password,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                http_error_rate=args.http_error_rate,
+                forbidden_rate=args.forbidden_rate,
+                session_lifetime=args.session_lifetime,
+                expiry_rate=args.expiry_rate,
+                task_duration=args.task_duration,
+                task_fail_rate=args.task_fail_rate
+            )
+            asyncio.run(run_mock_nas(nas, args.host, args.port))
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\nBot stopped by user")
     except Exception as e:
         logging.error(f"Fatal error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,275 @@
+"""
+Crash-safe on-disk spool for submissions made while the NAS is unreachable.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, IO, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one process per spool is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds over which the reported drain rate is averaged
+DRAIN_RATE_WINDOW = 60.0
+
+
+class SpoolInUseError(Exception):
+    """Another process has the spool open."""
+
+
+class SubmissionSpool:
+    """
+    Append-only spool file of pending download submissions.
+
+    Records are appended as JSON lines. Concurrent appends are group
+    committed: they are written and fsynced together every
+    ``fsync_interval`` seconds, and ``put`` returns only once its record is
+    on disk. A drainer replays the spool in order at no more than
+    ``drain_rate`` records per second; while the NAS is still down its
+    submissions wait on the client's circuit breaker, so the drainer doubles
+    as the probe that detects recovery. The read position is kept in a ``.offset`` file next to
+    the spool, so a restart resumes where draining stopped; the spool is
+    truncated once it has been fully drained. A ``.lock`` file keeps a
+    second process from opening the same spool.
+    """
+
+    def __init__(self, path: str, submit: Callable[[Dict[str, Any]], Awaitable[bool]],
+                 drain_rate: float = 5.0, fsync_interval: float = 0.2,
+                 read_batch: int = 100, retry_delay: float = 5.0):
+        """
+        Initialize the spool.
+
+        Args:
+            path: Spool file path
+            submit: Coroutine function replaying a record; returns False if the
+                NAS is unavailable again and draining should pause
+            drain_rate: Maximum number of records replayed per second
+            fsync_interval: Seconds between group commits
+            read_batch: Number of records read from disk at once while draining
+            retry_delay: Seconds to pause after a replay found the NAS unavailable
+        """
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.lock_path = path + ".lock"
+        self.submit = submit
+        self.drain_rate = drain_rate
+        self.fsync_interval = fsync_interval
+        self.read_batch = read_batch
+        self.retry_delay = retry_delay
+
+        self.pending = 0
+        self.spooled_total = 0
+        self.drained_total = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spool")
+        self._buffer: List[Tuple[str, asyncio.Future]] = []
+        self._offset = 0
+        self._has_work = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._drain_times: Deque[float] = deque()
+        self._lock_file: Optional[IO] = None
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a function on the spool's file thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        """
+        Load the drain position and start the writer and drainer.
+
+        Raises:
+            SpoolInUseError: If another process has the spool open
+        """
+        try:
+            await self._run(self._lock)
+        except SpoolInUseError:
+            self._executor.shutdown(wait=False)
+            raise
+        self._offset, self.pending = await self._run(self._load)
+        if self.pending:
+            logger.info(f"Found {self.pending} spooled submission(s) in {self.path}")
+            self._has_work.set()
+        self._tasks = [
+            asyncio.create_task(self._write_loop(), name="spool-writer"),
+            asyncio.create_task(self._drain_loop(), name="spool-drainer"),
+        ]
+
+    async def close(self):
+        """Stop draining and commit any buffered records."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._tasks:
+            await self._run(self._save_offset, self._offset)
+        self._tasks = []
+        await self._commit()
+        await self._run(self._unlock)
+        self._executor.shutdown(wait=True)
+
+    async def put(self, record: Dict[str, Any]):
+        """Append a record and wait until it is safely on disk."""
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((json.dumps(record) + "\n", future))
+        await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Return spool size and drain counters."""
+        self._prune_drain_times()
+        return {
+            "pending": self.pending,
+            "spooled_total": self.spooled_total,
+            "drained_total": self.drained_total,
+            "drain_rate_per_s": round(len(self._drain_times) / DRAIN_RATE_WINDOW, 2),
+        }
+
+    def _prune_drain_times(self):
+        """Forget replays older than the drain rate window."""
+        cutoff = time.monotonic() - DRAIN_RATE_WINDOW
+        while self._drain_times and self._drain_times[0] < cutoff:
+            self._drain_times.popleft()
+
+    def _lock(self):
+        """Take the spool's lock file (file thread)."""
+        if fcntl is None:
+            return
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise SpoolInUseError(f"{self.path} is in use by another process")
+        self._lock_file = lock_file
+
+    def _unlock(self):
+        """Release the spool's lock file (file thread)."""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self) -> Tuple[int, int]:
+        """Read the drain offset and count undrained records (file thread)."""
+        offset = 0
+        if os.path.exists(self.offset_path):
+            with open(self.offset_path, "r", encoding="utf-8") as f:
+                offset = int(f.read().strip() or 0)
+        pending = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                pending = sum(1 for line in f if line.endswith(b"\n"))
+        return offset, pending
+
+    async def _write_loop(self):
+        """Group commit buffered records."""
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            await self._commit()
+
+    async def _commit(self):
+        """Write and fsync every buffered record, then release their callers."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await self._run(self._append, "".join(line for line, _ in batch))
+        except Exception as e:
+            logger.error(f"Spool write error: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.pending += len(batch)
+        self.spooled_total += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+        self._has_work.set()
+
+    def _append(self, data: str):
+        """Append data to the spool and flush it to disk (file thread)."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self, offset: int, limit: int) -> List[Tuple[Optional[Dict[str, Any]], int]]:
+        """
+        Read up to ``limit`` complete records after ``offset`` (file thread).
+
+        Each record is returned with the offset just past it; corrupt records
+        are returned as None so the drainer can step over them.
+        """
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while len(records) < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    # End of file or a record still being written
+                    break
+                offset += len(line)
+                try:
+                    records.append((json.loads(line), offset))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt spool record: {line.strip()!r}")
+                    records.append((None, offset))
+        return records
+
+    def _save_offset(self, offset: int):
+        """Persist the drain position atomically (file thread)."""
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def _compact(self, offset: int) -> bool:
+        """Truncate the spool if everything up to its end was drained (file thread)."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != offset:
+            return False
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self._save_offset(0)
+        return True
+
+    async def _drain_loop(self):
+        """Replay spooled records in order at a controlled rate."""
+        interval = 1.0 / self.drain_rate if self.drain_rate > 0 else 0.0
+        while True:
+            await self._has_work.wait()
+
+            records = await self._run(self._read, self._offset, self.read_batch)
+            if not records:
+                self._has_work.clear()
+                if await self._run(self._compact, self._offset):
+                    self._offset = 0
+                continue
+
+            paused = False
+            for record, next_offset in records:
+                started = time.monotonic()
+                if record is not None and not await self.submit(record):
+                    logger.warning(f"NAS still unavailable, {self.pending} submission(s) remain spooled")
+                    paused = True
+                    break
+                self._offset = next_offset
+                self.pending = max(0, self.pending - 1)
+                self.drained_total += 1
+                self._drain_times.append(time.monotonic())
+                self._prune_drain_times()
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+            await self._run(self._save_offset, self._offset)
+            if paused:
+                await asyncio.sleep(self.retry_delay)
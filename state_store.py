@@ -0,0 +1,294 @@
+"""
+Persistent state for Discord Showcase Loader, kept in a local SQLite database.
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    processed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submitted_urls (
+    url TEXT PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    destination TEXT NOT NULL,
+    task_id TEXT,
+    submitted_at REAL NOT NULL,
+    media_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_submitted_urls_message ON submitted_urls (message_id);
+CREATE INDEX IF NOT EXISTS idx_submitted_urls_task ON submitted_urls (task_id);
+CREATE TABLE IF NOT EXISTS archive_cursors (
+    channel_id INTEGER PRIMARY KEY,
+    start_id INTEGER NOT NULL,
+    cursor_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channel_watermarks (
+    channel_id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, created on databases that lack them
+MIGRATIONS = (
+    ("submitted_urls", "media_key", "TEXT"),
+)
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_submitted_urls_media_key ON submitted_urls (media_key);
+"""
+
+
+class StateStore:
+    """
+    SQLite-backed store of processed messages, submitted URLs and channel watermarks.
+
+    Submitted URLs are stored with the canonical key of their media (see
+    media_extractor.canonical_url_key), so a repost of the same media under
+    another URL is recognized even after a restart.
+
+    The database runs in WAL mode on a single dedicated thread, so the event
+    loop never touches the disk. Writes are buffered in memory and committed
+    in one transaction per flush, either every ``flush_interval`` seconds or
+    as soon as ``max_batch`` writes are pending. Reads consult the pending
+    buffer first, so a record is visible as soon as it is written.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, max_batch: int = 1000):
+        """
+        Initialize the state store.
+
+        Args:
+            path: Path to the SQLite database file
+            flush_interval: Seconds between write batches
+            max_batch: Number of pending writes that triggers an early flush
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_needed = asyncio.Event()
+
+        self._pending_messages: Dict[int, Tuple[int, int, float]] = {}
+        self._pending_urls: Dict[str, Tuple[str, int, str, Optional[str], float, Optional[str]]] = {}
+        self._pending_media: Dict[str, str] = {}  # Media key -> URL in _pending_urls
+        self._pending_forgets: Set[str] = set()
+        self._pending_watermarks: Dict[int, Tuple[int, int, float]] = {}
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a function on the database thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        """Open the database and create the schema (database thread)."""
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        for table, column, column_type in MIGRATIONS:
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        self._conn.executescript(INDEXES)
+        self._conn.commit()
+
+    async def open(self):
+        """Open the database and start the background writer."""
+        await self._run(self._connect)
+        self._flush_task = asyncio.create_task(self._flush_loop(), name="state-store-flush")
+        logger.info(f"Opened state database {self.path}")
+
+    async def close(self):
+        """Flush pending writes and close the database."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self._conn is not None:
+            await self.flush()
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+    def record_message(self, channel_id: int, message_id: int):
+        """Queue a processed message for writing."""
+        self._pending_messages[message_id] = (message_id, channel_id, time.time())
+        self._maybe_flush()
+
+    def record_submission(self, url: str, message_id: int, destination: str,
+                          task_id: Optional[str] = None, media_key: Optional[str] = None):
+        """Queue a submitted URL (and its Download Station task ID and media key) for writing."""
+        self._pending_urls[url] = (url, message_id, destination, task_id, time.time(), media_key)
+        if media_key is not None:
+            self._pending_media[media_key] = url
+            self._pending_forgets.discard(media_key)
+        self._maybe_flush()
+
+    def forget_media(self, media_key: str):
+        """Queue the removal of every submission of a media key, e.g. after its download failed."""
+        url = self._pending_media.pop(media_key, None)
+        if url is not None:
+            self._pending_urls.pop(url, None)
+        self._pending_forgets.add(media_key)
+        self._maybe_flush()
+
+    def record_watermark(self, channel_id: int, message_id: int):
+        """Queue the newest handled message ID of a channel for writing."""
+        pending = self._pending_watermarks.get(channel_id)
+        if pending is None or message_id > pending[1]:
+            self._pending_watermarks[channel_id] = (channel_id, message_id, time.time())
+
+    async def get_watermark(self, channel_id: int) -> Optional[int]:
+        """Return the newest handled message ID of a channel, or None if unknown."""
+        row = await self._run(self._fetch_one,
+                              "SELECT message_id FROM channel_watermarks WHERE channel_id = ?",
+                              (channel_id,))
+        stored = row[0] if row else None
+        pending = self._pending_watermarks.get(channel_id)
+        if pending is not None and (stored is None or pending[1] > stored):
+            return pending[1]
+        return stored
+
+    async def save_archive_cursor(self, channel_id: int, start_id: int, cursor_id: int):
+        """Store how far an archive run starting at ``start_id`` has progressed."""
+        await self._run(self._execute,
+                        "INSERT OR REPLACE INTO archive_cursors "
+                        "(channel_id, start_id, cursor_id, updated_at) VALUES (?, ?, ?, ?)",
+                        (channel_id, start_id, cursor_id, time.time()))
+
+    async def get_archive_cursor(self, channel_id: int, start_id: int) -> Optional[int]:
+        """Return the saved cursor of an interrupted archive run with the same start, if any."""
+        row = await self._run(self._fetch_one,
+                              "SELECT cursor_id FROM archive_cursors "
+                              "WHERE channel_id = ? AND start_id = ?",
+                              (channel_id, start_id))
+        return row[0] if row else None
+
+    async def clear_archive_cursor(self, channel_id: int):
+        """Forget the archive cursor of a channel once its archive is complete."""
+        await self._run(self._execute,
+                        "DELETE FROM archive_cursors WHERE channel_id = ?",
+                        (channel_id,))
+
+    def _maybe_flush(self):
+        """Wake the writer early once enough writes are pending."""
+        if (len(self._pending_messages) + len(self._pending_urls)
+                + len(self._pending_forgets) >= self.max_batch):
+            self._flush_needed.set()
+
+    async def is_message_processed(self, message_id: int) -> bool:
+        """Check whether a message was processed, including in earlier runs."""
+        if message_id in self._pending_messages:
+            return True
+        row = await self._run(self._fetch_one,
+                              "SELECT 1 FROM processed_messages WHERE message_id = ?",
+                              (message_id,))
+        return row is not None
+
+    async def get_submission(self, media_key: str) -> Optional[Dict[str, Any]]:
+        """Return the latest stored submission of a media key, or None if it was never submitted."""
+        if media_key in self._pending_forgets:
+            return None
+        url = self._pending_media.get(media_key)
+        if url is not None:
+            row = self._pending_urls[url]
+        else:
+            row = await self._run(
+                self._fetch_one,
+                "SELECT url, message_id, destination, task_id, submitted_at, media_key "
+                "FROM submitted_urls WHERE media_key = ? ORDER BY submitted_at DESC LIMIT 1",
+                (media_key,)
+            )
+        if row is None:
+            return None
+        return dict(zip(("url", "message_id", "destination", "task_id", "submitted_at", "media_key"), row))
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[tuple]:
+        """Run a query and return its first row (database thread)."""
+        return self._conn.execute(sql, params).fetchone()
+
+    def _execute(self, sql: str, params: tuple):
+        """Run a single statement in its own transaction (database thread)."""
+        with self._conn:
+            self._conn.execute(sql, params)
+
+    async def flush(self):
+        """Write all pending records in a single transaction."""
+        if (not self._pending_messages and not self._pending_urls and not self._pending_watermarks
+                and not self._pending_forgets):
+            return
+        messages = list(self._pending_messages.values())
+        urls = list(self._pending_urls.values())
+        watermarks = list(self._pending_watermarks.values())
+        forgets = [(media_key,) for media_key in self._pending_forgets]
+        self._pending_messages = {}
+        self._pending_urls = {}
+        self._pending_media = {}
+        self._pending_watermarks = {}
+        self._pending_forgets = set()
+        try:
+            await self._run(self._write, messages, urls, watermarks, forgets)
+        except Exception as e:
+            logger.error(f"State database write error: {str(e)}")
+            # Keep the records for the next flush unless newer ones replaced them
+            for row in messages:
+                self._pending_messages.setdefault(row[0], row)
+            for (media_key,) in forgets:
+                if media_key not in self._pending_media:
+                    self._pending_forgets.add(media_key)
+            for row in urls:
+                if row[0] not in self._pending_urls and row[5] not in self._pending_forgets:
+                    self._pending_urls[row[0]] = row
+                    if row[5] is not None:
+                        self._pending_media.setdefault(row[5], row[0])
+            for row in watermarks:
+                self.record_watermark(row[0], row[1])
+
+    def _write(self, messages: List[tuple], urls: List[tuple], watermarks: List[tuple],
+               forgets: List[tuple]):
+        """Insert a batch of records (database thread)."""
+        with self._conn:
+            self._conn.executemany("DELETE FROM submitted_urls WHERE media_key = ?", forgets)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO processed_messages (message_id, channel_id, processed_at) "
+                "VALUES (?, ?, ?)",
+                messages
+            )
+            self._conn.executemany(
+                "INSERT INTO submitted_urls (url, message_id, destination, task_id, submitted_at, media_key) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET task_id = COALESCE(excluded.task_id, task_id), "
+                "submitted_at = excluded.submitted_at, media_key = excluded.media_key",
+                urls
+            )
+            self._conn.executemany(
+                "INSERT INTO channel_watermarks (channel_id, message_id, updated_at) "
+                "VALUES (?, ?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET "
+                "message_id = MAX(message_id, excluded.message_id), updated_at = excluded.updated_at",
+                watermarks
+            )
+
+    async def _flush_loop(self):
+        """Flush pending writes periodically or when the batch is full."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            await self.flush()
+
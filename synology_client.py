@@ -1,19 +1,405 @@
 """
 Synology Download Station API client for managing downloads.
 """
-import requests
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any
+import random
+import time
+from typing import Optional, Dict, Any, List, Tuple, Union, Iterable, AsyncIterator, Callable
 from urllib.parse import urljoin
 
+import aiohttp
+
+from logging_setup import SAMPLED
+
 logger = logging.getLogger(__name__)
 
+# Download Station 2 reports task status as a number
+TASK_STATUS_NAMES = {
+    1: "waiting",
+    2: "downloading",
+    3: "paused",
+    4: "finishing",
+    5: "finished",
+    6: "hash_checking",
+    7: "pre_seeding",
+    8: "seeding",
+    9: "filehosting_waiting",
+    10: "extracting",
+    11: "preprocessing",
+    12: "preprocess_pass",
+    13: "downloaded",
+    14: "postprocessing",
+    15: "captcha_needed",
+}
+
+
+# DSM error codes meaning the session is no longer valid
+SESSION_ERROR_CODES = frozenset({106, 107, 119})
+
+# DSM error codes worth retrying: unknown error. Anything else (bad parameters,
+# permissions, missing destination, "max number of tasks reached"...) is fatal.
+RETRYABLE_ERROR_CODES = frozenset({100})
+
+
+def task_status_name(status: Any) -> str:
+    """Return the status name of a task as reported by either Download Station API."""
+    if isinstance(status, int):
+        return TASK_STATUS_NAMES.get(status, "error" if status >= 100 else "unknown")
+    return str(status)
+
+
+class TaskResult:
+    """
+    Outcome of submitting one URL to Download Station. Truthy on success.
+    
+    ``unreachable`` is set when the NAS could not be reached at all, so the
+    submission may be kept and tried again later.
+    """
+    
+    __slots__ = ("success", "task_id", "error_code", "unreachable")
+    
+    def __init__(self, success: bool, task_id: Optional[str] = None,
+                 error_code: Optional[int] = None, unreachable: bool = False):
+        self.success = success
+        self.task_id = task_id
+        self.error_code = error_code
+        self.unreachable = unreachable
+    
+    def __bool__(self) -> bool:
+        return self.success
+    
+    def __repr__(self) -> str:
+        return (f"TaskResult(success={self.success}, task_id={self.task_id!r}, "
+                f"error_code={self.error_code}, unreachable={self.unreachable})")
+
+
+class RetryableError(Exception):
+    """A NAS request failed in a way that may succeed if it is retried."""
+    
+    def __init__(self, message: str, result: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.result = result
+
+
+class RetryPolicy:
+    """
+    Retries retryable failures with exponential backoff and full jitter.
+    
+    The n-th retry waits a random time between 0 and
+    ``min(max_delay, base_delay * 2 ** n)`` seconds, which spreads out
+    retries from many concurrent callers.
+    """
+    
+    def __init__(self, attempts: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize the retry policy.
+        
+        Args:
+            attempts: Total number of attempts, including the first one
+            base_delay: Backoff before the first retry in seconds
+            max_delay: Upper bound of the backoff in seconds
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = 0
+    
+    def backoff(self, retry: int) -> float:
+        """Return the delay before the given retry (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+    
+    async def call(self, func, *args, **kwargs):
+        """
+        Call a coroutine function, retrying it on RetryableError.
+        
+        Returns:
+            The function's result
+            
+        Raises:
+            RetryableError: If every attempt failed
+        """
+        self.calls += 1
+        for attempt in range(self.attempts):
+            try:
+                return await func(*args, **kwargs)
+            except RetryableError as e:
+                if attempt + 1 >= self.attempts:
+                    self.exhausted += 1
+                    raise
+                delay = self.backoff(attempt)
+                self.retries += 1
+                logger.warning(f"NAS request failed ({e}), retrying in {delay:.1f}s "
+                               f"(attempt {attempt + 2}/{self.attempts})")
+                await asyncio.sleep(delay)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return retry counters."""
+        return {"calls": self.calls, "retries": self.retries, "exhausted": self.exhausted}
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a NAS that keeps failing.
+    
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    callers wait locally instead of hitting the NAS. Once ``reset_timeout``
+    seconds have passed a single probe request is let through: if it
+    succeeds the circuit closes and the waiting callers proceed, otherwise
+    it stays open for another ``reset_timeout``.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to wait before probing an open circuit
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.waits = 0
+        
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._changed = asyncio.Event()
+    
+    @property
+    def is_open(self) -> bool:
+        """Check whether requests are currently being held back."""
+        return self.state != self.CLOSED
+    
+    def _transition(self, state: str):
+        """Change state and wake everyone waiting for a change."""
+        self.state = state
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def acquire(self):
+        """Wait until a request may be sent to the NAS."""
+        waited = False
+        while True:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return
+            
+            if not waited:
+                waited = True
+                self.waits += 1
+            
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - now
+                if remaining <= 0:
+                    # This caller becomes the probe
+                    self._probe_started = now
+                    self._transition(self.HALF_OPEN)
+                    return
+                changed = self._changed
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # Half open: wait for the probe, taking over if it never reports back
+            remaining = self._probe_started + self.reset_timeout - now
+            if remaining <= 0:
+                self._probe_started = now
+                return
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+    
+    def record_success(self):
+        """Record a request that reached the NAS."""
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info("NAS reachable again, closing circuit breaker")
+            self._transition(self.CLOSED)
+    
+    def record_failure(self):
+        """Record a request that could not reach the NAS."""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(f"NAS unreachable after {self.consecutive_failures} failure(s), "
+                           f"opening circuit breaker for {self.reset_timeout:.0f}s")
+            self._transition(self.OPEN)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return circuit breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "waits": self.waits,
+        }
+
+
+class SessionManager:
+    """
+    Single-flight DSM session handling for a SynologyDownloadStation client.
+    
+    Only one login runs at a time; concurrent callers that find the session
+    expired wait for it instead of logging in themselves. The age at which
+    DSM last timed out a session (error 119) is remembered, and sessions are
+    renewed proactively once they reach ``renew_margin`` of that age.
+    
+    Sessions invalidated younger than ``min_lifetime`` (a NAS reboot, an
+    admin kick) and other session errors (106, or 107 for a duplicate login)
+    do not teach the lifetime. After ``relearn_after`` proactive renewals
+    the estimate is dropped and one session is left to run until DSM times
+    it out, so an estimate that is too short recovers.
+    """
+    
+    # DSM error code for a session that timed out
+    TIMEOUT_ERROR_CODE = 119
+    
+    def __init__(self, client: "SynologyDownloadStation", renew_margin: float = 0.8,
+                 min_lifetime: float = 60.0, relearn_after: int = 20):
+        """
+        Initialize the session manager.
+        
+        Args:
+            client: The client whose session is managed
+            renew_margin: Fraction of the observed session lifetime after which
+                the session is renewed before DSM expires it
+            min_lifetime: Shortest session age in seconds taken as a lifetime
+            relearn_after: Proactive renewals after which the lifetime is learned again
+        """
+        self.client = client
+        self.renew_margin = renew_margin
+        self.min_lifetime = min_lifetime
+        self.relearn_after = max(1, relearn_after)
+        self.lifetime: Optional[float] = None
+        self.logged_in_at: Optional[float] = None
+        
+        self.logins = 0
+        self.login_failures = 0
+        self.expiries = 0
+        self.proactive_renewals = 0
+        
+        self._renewals_since_learned = 0
+        self._lock = asyncio.Lock()
+        self._expired_session: Optional[str] = None
+    
+    def _needs_renewal(self) -> bool:
+        """Check whether the current session is close to its observed lifetime."""
+        if self.lifetime is None or self.logged_in_at is None:
+            return False
+        return time.monotonic() - self.logged_in_at >= self.lifetime * self.renew_margin
+    
+    async def ensure(self):
+        """Renew the current session ahead of time if it is about to expire."""
+        session_id = self.client.session_id
+        if session_id and self._needs_renewal():
+            async with self._lock:
+                if self.client.session_id != session_id:
+                    return
+                logger.info("Renewing Synology session before it expires")
+                self.proactive_renewals += 1
+                self._renewals_since_learned += 1
+                if self._renewals_since_learned >= self.relearn_after:
+                    # Let the next session run until DSM expires it
+                    self.lifetime = None
+                try:
+                    await self._login()
+                except RetryableError as e:
+                    # Keep the current session; the request itself will find out
+                    logger.warning(f"Could not renew Synology session: {str(e)}")
+    
+    async def refresh(self, stale_session: Optional[str] = None) -> bool:
+        """
+        Log in, unless another caller already replaced ``stale_session``.
+        
+        Args:
+            stale_session: The session ID the caller found invalid, or None
+                to log in unconditionally
+            
+        Returns:
+            True if a valid session is available afterwards
+            
+        Raises:
+            RetryableError: If the NAS could not be reached
+        """
+        async with self._lock:
+            if stale_session is not None and self.client.session_id not in (None, stale_session):
+                return True
+            return await self._login()
+    
+    def expired(self, session_id: Optional[str], error_code: Optional[int] = None):
+        """
+        Record that DSM rejected a session, learning its lifetime from timeouts.
+        
+        Args:
+            session_id: The rejected session
+            error_code: DSM error code of the rejection
+        """
+        if session_id is None or session_id == self._expired_session:
+            return
+        self._expired_session = session_id
+        self.expiries += 1
+        if session_id != self.client.session_id or self.logged_in_at is None:
+            return
+        
+        age = time.monotonic() - self.logged_in_at
+        if error_code != self.TIMEOUT_ERROR_CODE or age < self.min_lifetime:
+            logger.info(f"Synology session invalidated ({error_code}) after {age:.0f}s")
+            return
+        self.lifetime = age
+        self._renewals_since_learned = 0
+        logger.info(f"Synology session expired after {age:.0f}s")
+    
+    async def _login(self) -> bool:
+        """Perform the login and update the counters (lock held)."""
+        try:
+            success = await self.client._login()
+        except RetryableError:
+            self.login_failures += 1
+            raise
+        if success:
+            self.logins += 1
+            self.logged_in_at = time.monotonic()
+        else:
+            self.login_failures += 1
+        return success
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return session counters."""
+        return {
+            "logins": self.logins,
+            "login_failures": self.login_failures,
+            "expiries": self.expiries,
+            "proactive_renewals": self.proactive_renewals,
+            "observed_lifetime": self.lifetime,
+        }
+
 
 class SynologyDownloadStation:
     """Client for interacting with Synology Download Station API."""
     
     def __init__(self, host: str, port: int = 5000, use_https: bool = False,
-                 username: str = "", password: str = ""):
+                 username: str = "", password: str = "",
+                 max_connections: int = 10, keepalive_timeout: float = 30.0,
+                 request_timeout: float = 10.0, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         """
         Initialize the Synology Download Station client.
         
@@ -23,6 +409,11 @@ class SynologyDownloadStation:
             use_https: Whether to use HTTPS
             username: NAS username
             password: NAS password
+            max_connections: Maximum number of pooled connections to the NAS
+            keepalive_timeout: Seconds an idle pooled connection is kept open
+            request_timeout: Total timeout for a single API request in seconds
+            retry_policy: Retry policy for API calls (default: RetryPolicy())
+            circuit_breaker: Circuit breaker for API calls (default: CircuitBreaker())
         """
         self.host = host
         self.port = port
@@ -31,23 +422,195 @@ class SynologyDownloadStation:
         self.password = password
         self.session_id: Optional[str] = None
         
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._http: Optional[aiohttp.ClientSession] = None
+        self.sessions = SessionManager(self)
+        self.retry = retry_policy or RetryPolicy()
+        self.breaker = circuit_breaker or CircuitBreaker()
+        
+        # Requests currently waiting on the NAS, and an optional latency hook
+        # called with (DSM method, seconds) after every request
+        self.in_flight = 0
+        self.observe_request: Optional[Callable[[str, float], None]] = None
+        
         protocol = "https" if use_https else "http"
         self.base_url = f"{protocol}://{host}:{port}"
         self.api_url = urljoin(self.base_url, "/webapi/")
+    
+    def _get_http(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it on first use.
+        
+        The session is created lazily so that it is bound to the running
+        event loop. All requests go through a single keep-alive connection
+        pool, so TCP connections and TLS sessions to DSM are reused.
+        """
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                # NAS certificates are usually self-signed
+                ssl=False,
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                # The session cookie is passed explicitly on every request
+                cookie_jar=aiohttp.DummyCookieJar(),
+            )
+        return self._http
+    
+    async def _request(self, method: str, cgi: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       data: Optional[Dict[str, Any]] = None) -> aiohttp.ClientResponse:
+        """
+        Send a request to a DSM web API endpoint and read its body.
+        
+        Args:
+            method: HTTP method ("GET" or "POST")
+            cgi: CGI path relative to /webapi/
+            params: Query string parameters
+            data: Form data for POST requests
+            
+        Returns:
+            The response, with its body already read
+        """
+        cookies = {"id": self.session_id} if self.session_id else None
+        url = urljoin(self.api_url, cgi)
+        
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            async with self._get_http().request(method, url, params=params, data=data,
+                                                cookies=cookies) as response:
+                response.raise_for_status()
+                await response.read()
+                return response
+        finally:
+            self.in_flight -= 1
+            if self.observe_request is not None:
+                api_method = (data or params or {}).get("method", "unknown")
+                self.observe_request(api_method, time.perf_counter() - started)
+    
+    async def _api_call(self, method: str, cgi: str,
+                        params: Optional[Dict[str, Any]] = None,
+                        data: Optional[Dict[str, Any]] = None,
+                        idempotent: bool = True) -> Dict[str, Any]:
+        """
+        Call an authenticated DSM API and return its decoded JSON.
+        
+        Transport errors, HTTP 5xx responses and retryable DSM error codes
+        are retried according to the retry policy, and requests wait while
+        the circuit breaker is open. If every attempt fails with a DSM error
+        the last response is returned; transport errors are raised.
+        
+        A request that is not idempotent, such as creating a task, is only
+        retried if it never reached the NAS (a connection error). After a
+        timeout or HTTP 5xx, DSM may already have acted on it, so the error
+        is raised as is rather than risk doing it twice.
+        """
+        await self.sessions.ensure()
+        
+        try:
+            return await self.retry.call(self._api_call_once, method, cgi, params, data,
+                                         idempotent)
+        except RetryableError as e:
+            if e.result is not None:
+                return e.result
+            raise
+    
+    async def _api_call_once(self, method: str, cgi: str,
+                             params: Optional[Dict[str, Any]],
+                             data: Optional[Dict[str, Any]],
+                             idempotent: bool = True) -> Dict[str, Any]:
+        """
+        Send one API request through the circuit breaker.
         
-        # Disable SSL warnings if using HTTPS without proper certificates
-        if use_https:
-            requests.packages.urllib3.disable_warnings()
+        If DSM reports that the session expired, the session is renewed
+        (once, shared with any concurrent callers) and the request is
+        replayed a single time.
+        """
+        await self.breaker.acquire()
+        
+        for attempt in range(2):
+            session_id = self.session_id
+            try:
+                response = await self._request(method, cgi, params=params, data=data)
+                result = await response.json(content_type=None)
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500:
+                    # The NAS answered; retrying will not change the outcome
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if not idempotent:
+                    raise
+                raise RetryableError(f"HTTP {e.status}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                if not idempotent and not isinstance(e, aiohttp.ClientConnectorError):
+                    raise
+                raise RetryableError(str(e) or type(e).__name__) from e
+            
+            self.breaker.record_success()
+            
+            error_code = None if result.get("success") else result.get("error", {}).get("code")
+            if error_code in RETRYABLE_ERROR_CODES:
+                raise RetryableError(f"DSM error {error_code}", result)
+            if error_code not in SESSION_ERROR_CODES or attempt:
+                return result
+            
+            logger.warning(f"Session expired ({error_code}) - re-authenticating")
+            self.sessions.expired(session_id, error_code)
+            if not await self.sessions.refresh(session_id):
+                return result
+        
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return session, retry and circuit breaker counters."""
+        return {
+            "session": self.sessions.stats(),
+            "retry": self.retry.stats(),
+            "circuit_breaker": self.breaker.stats(),
+        }
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
     
     async def login(self) -> bool:
         """
         Login to the Synology NAS and obtain a session ID.
         
+        Concurrent calls share a single login request, and transport errors
+        are retried according to the retry policy.
+        
         Returns:
             True if login successful, False otherwise
         """
-        login_url = urljoin(self.api_url, "auth.cgi")
+        try:
+            return await self.retry.call(self.sessions.refresh)
+        except RetryableError as e:
+            logger.error(f"Login error: {str(e)}")
+            return False
+    
+    async def _login(self) -> bool:
+        """
+        Send the login request (use login() or the session manager instead).
         
+        Returns:
+            True if login successful, False if DSM rejected it
+            
+        Raises:
+            RetryableError: If the NAS could not be reached (counted as a
+                circuit breaker failure)
+        """
         params = {
             "api": "SYNO.API.Auth",
             "version": "6",
@@ -59,21 +622,31 @@ class SynologyDownloadStation:
         }
         
         try:
-            response = requests.get(login_url, params=params, verify=False, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("success"):
-                self.session_id = response.cookies.get("id")
-                logger.info("Successfully logged in to Synology NAS")
-                return True
-            else:
-                logger.error(f"Login failed: {data.get('error', {})}")
+            response = await self._request("GET", "auth.cgi", params=params)
+            data = await response.json(content_type=None)
+        except aiohttp.ClientResponseError as e:
+            if e.status < 500:
+                self.breaker.record_success()
+                logger.error(f"Login error: HTTP {e.status}")
                 return False
-                
-        except Exception as e:
+            self.breaker.record_failure()
+            raise RetryableError(f"login HTTP {e.status}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.breaker.record_failure()
+            raise RetryableError(f"login {str(e) or type(e).__name__}") from e
+        except ValueError as e:
             logger.error(f"Login error: {str(e)}")
             return False
+        
+        self.breaker.record_success()
+        if data.get("success"):
+            cookie = response.cookies.get("id")
+            self.session_id = cookie.value if cookie else data.get("data", {}).get("sid")
+            logger.info("Successfully logged in to Synology NAS")
+            return True
+        else:
+            logger.error(f"Login failed: {data.get('error', {})}")
+            return False
     
     async def logout(self) -> bool:
         """
@@ -84,8 +657,6 @@ class SynologyDownloadStation:
         """
         if not self.session_id:
             return True
-            
-        logout_url = urljoin(self.api_url, "auth.cgi")
         
         params = {
             "api": "SYNO.API.Auth",
@@ -95,13 +666,13 @@ class SynologyDownloadStation:
         }
         
         try:
-            response = requests.get(logout_url, params=params, verify=False, timeout=10)
-            response.raise_for_status()
+            response = await self._request("GET", "auth.cgi", params=params)
             
-            data = response.json()
+            data = await response.json(content_type=None)
             if data.get("success"):
                 logger.info("Successfully logged out from Synology NAS")
                 self.session_id = None
+                self.sessions.logged_in_at = None
                 return True
             else:
                 logger.error(f"Logout failed: {data.get('error', {})}")
@@ -122,36 +693,58 @@ class SynologyDownloadStation:
         Returns:
             True if task created successfully, False otherwise
         """
+        results = await self.create_download_tasks([url], destination)
+        return results[0].success
+    
+    async def create_download_tasks(self, urls: List[str], destination: str = "") -> List[TaskResult]:
+        """
+        Create download tasks for several URLs with a single API call.
+        
+        If the NAS rejects a batch of more than one URL, each URL is retried
+        on its own so that one bad link does not fail the others.
+        
+        Args:
+            urls: URLs of the files to download
+            destination: Destination folder shared by all URLs (optional)
+            
+        Returns:
+            One result per URL, in the same order as ``urls``. Task IDs are
+            filled in when Download Station reports one per URL.
+        """
+        if not urls:
+            return []
+        
         if not self.session_id:
             logger.error("Not logged in to Synology NAS")
-            return False
-        
-        download_url = urljoin(self.api_url, "DownloadStation/task.cgi")
+            return [TaskResult(False) for _ in urls]
         
         # Use POST data instead of GET parameters for task creation
-        # This prevents 403 Forbidden errors that occur with GET requests
+        # This prevents 403 Forbidden errors that occur with GET requests.
+        # Multiple URIs are comma separated, so commas inside a URL are escaped.
         data = {
             "api": "SYNO.DownloadStation2.Task",
             "version": "3",
             "method": "create",
-            "uri": url
+            "uri": ",".join(url.replace(",", "%2C") for url in urls)
         }
         
         if destination:
             data["destination"] = destination
         
-        cookies = {"id": self.session_id}
-        
         try:
             # Use POST instead of GET for task creation operations
-            response = requests.post(download_url, data=data, cookies=cookies,
-                                   verify=False, timeout=10)
-            response.raise_for_status()
+            # Not retried once it may have reached the NAS, so a task is never created twice
+            response_data = await self._api_call("POST", "DownloadStation/task.cgi", data=data,
+                                                 idempotent=False)
             
-            response_data = response.json()
             if response_data.get("success"):
-                logger.info(f"Successfully created download task for: {url}")
-                return True
+                task_ids = response_data.get("data", {}).get("task_id") or []
+                if len(task_ids) != len(urls):
+                    task_ids = [None] * len(urls)
+                for url, task_id in zip(urls, task_ids):
+                    logger.info(f"Successfully created download task for: {url}",
+                                extra={**SAMPLED, "task_id": task_id, "url": url})
+                return [TaskResult(True, task_id) for task_id in task_ids]
             else:
                 error_info = response_data.get("error", {})
                 error_code = error_info.get("code")
@@ -159,47 +752,60 @@ class SynologyDownloadStation:
                 # Handle specific error codes for better debugging
                 if error_code == 403:
                     logger.error(f"Access denied (403) - check permissions and session validity")
-                elif error_code == 119:
-                    logger.error(f"Session expired (119) - attempting to re-login")
-                    # Try to re-login and retry once
-                    if await self.login():
-                        return await self.create_download_task(url, destination)
+                elif error_code in SESSION_ERROR_CODES:
+                    logger.error(f"Session still invalid ({error_code}) after re-login")
                 else:
                     logger.error(f"Failed to create download task: {error_info}")
-                return False
+                
+                if len(urls) > 1 and error_code not in SESSION_ERROR_CODES:
+                    logger.warning(f"Batch of {len(urls)} URLs rejected, retrying individually")
+                    results = await asyncio.gather(
+                        *(self.create_download_tasks([url], destination) for url in urls)
+                    )
+                    return [result[0] for result in results]
+                return [TaskResult(False, error_code=error_code) for _ in urls]
                 
         except Exception as e:
-            logger.error(f"Download task creation error: {str(e)}")
-            return False
+            # Only a request that never reached the NAS is safe to spool and send again
+            unreachable = isinstance(e, RetryableError)
+            if unreachable:
+                logger.error(f"Download task creation error: {str(e)}")
+            else:
+                logger.error(f"Download task creation error, the task may still have been "
+                             f"created: {str(e) or type(e).__name__}")
+            return [TaskResult(False, unreachable=unreachable) for _ in urls]
     
-    async def get_task_list(self) -> Optional[Dict[str, Any]]:
+    async def get_task_list(self, offset: int = 0, limit: int = -1,
+                            additional: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
         """
         Get list of download tasks.
         
+        Args:
+            offset: Index of the first task to return
+            limit: Maximum number of tasks to return (-1 for all)
+            additional: Extra fields to include, e.g. ("detail", "transfer")
+        
         Returns:
-            Task list data if successful, None otherwise
+            Task list data (``tasks`` and ``total``) if successful, None otherwise
         """
         if not self.session_id:
             logger.error("Not logged in to Synology NAS")
             return None
         
-        task_url = urljoin(self.api_url, "DownloadStation/task.cgi")
-        task_url = urljoin(self.api_url, "entry.cgi")
-        
         params = {
             "api": "SYNO.DownloadStation2.Task",
             "version": "3",
-            "method": "list"
+            "method": "list",
+            "offset": offset,
+            "limit": limit
         }
         
-        cookies = {"id": self.session_id}
+        if additional:
+            params["additional"] = json.dumps(list(additional))
         
         try:
-            response = requests.post(task_url, params=params, cookies=cookies,
-                                  verify=False, timeout=10)
-            response.raise_for_status()
+            data = await self._api_call("POST", "entry.cgi", params=params)
             
-            data = response.json()
             if data.get("success"):
                 return data.get("data", {})
             else:
@@ -208,4 +814,181 @@ class SynologyDownloadStation:
                 
         except Exception as e:
             logger.error(f"Task list retrieval error: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    async def iter_tasks(self, page_size: int = 100,
+                         status: Optional[Union[str, Iterable[str]]] = None,
+                         destination: Optional[str] = None,
+                         additional: Tuple[str, ...] = ()) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over download tasks one page at a time.
+        
+        Only one page is held in memory at once, so this stays cheap on a NAS
+        with thousands of tasks.
+        
+        Args:
+            page_size: Number of tasks requested per API call
+            status: Only yield tasks with this status name (or any of several)
+            destination: Only yield tasks downloading to this folder
+            additional: Extra fields to include, e.g. ("transfer",)
+            
+        Yields:
+            Task dictionaries as returned by Download Station
+        """
+        statuses = {status} if isinstance(status, str) else set(status) if status else None
+        fields = tuple(additional)
+        if destination is not None and "detail" not in fields:
+            fields += ("detail",)
+        
+        offset = 0
+        while True:
+            page = await self.get_task_list(offset=offset, limit=page_size, additional=fields)
+            if page is None:
+                return
+            
+            tasks = page.get("tasks", [])
+            for task in tasks:
+                if statuses is not None and task_status_name(task.get("status")) not in statuses:
+                    continue
+                if (destination is not None and
+                        task.get("additional", {}).get("detail", {}).get("destination") != destination):
+                    continue
+                yield task
+            
+            offset += len(tasks)
+            if not tasks or offset >= page.get("total", 0):
+                return
+    
+    async def get_tasks(self, task_ids: List[str],
+                        additional: Tuple[str, ...] = ()) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the details of several download tasks with a single API call.
+        
+        Args:
+            task_ids: IDs of the tasks to look up
+            additional: Extra fields to include, e.g. ("transfer", "detail")
+            
+        Returns:
+            The tasks that still exist, or None if the request failed
+        """
+        if not self.session_id:
+            logger.error("Not logged in to Synology NAS")
+            return None
+        
+        data = {
+            "api": "SYNO.DownloadStation2.Task",
+            "version": "3",
+            "method": "get",
+            "id": json.dumps(list(task_ids))
+        }
+        
+        if additional:
+            data["additional"] = json.dumps(list(additional))
+        
+        try:
+            response_data = await self._api_call("POST", "entry.cgi", data=data)
+            
+            if response_data.get("success"):
+                return response_data.get("data", {}).get("task", [])
+            else:
+                logger.error(f"Failed to get tasks: {response_data.get('error', {})}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Task retrieval error: {str(e)}")
+            return None
+
+
+class BatchSubmitter:
+    """
+    Coalesces download task submissions into batched create calls.
+    
+    URLs submitted for the same destination within ``window`` seconds are
+    sent to Download Station in one request. A batch is flushed early once
+    it reaches ``max_batch_size`` URLs. Every caller still receives the
+    result for its own URL. At most ``max_in_flight`` create requests wait
+    on the NAS at once; the cap applies to requests rather than callers, so
+    a batch can always fill up while earlier ones are in flight.
+    """
+    
+    def __init__(self, client: SynologyDownloadStation, window: float = 0.05,
+                 max_batch_size: int = 20, max_in_flight: int = 16):
+        """
+        Initialize the batch submitter.
+        
+        Args:
+            client: Synology client used to create the tasks
+            window: Seconds to wait for more URLs before sending a batch
+            max_batch_size: Maximum number of URLs sent in one request
+            max_in_flight: Maximum number of create requests sent at once
+        """
+        self.client = client
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self._semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._in_flight: set = set()
+    
+    async def submit(self, url: str, destination: str = "") -> TaskResult:
+        """
+        Queue a URL for the next batch and wait for its result.
+        
+        Args:
+            url: URL of the file to download
+            destination: Destination folder (optional)
+            
+        Returns:
+            The result for this URL (truthy if the task was created)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        batch = self._pending.setdefault(destination, [])
+        batch.append((url, future))
+        
+        if len(batch) >= self.max_batch_size:
+            self._flush(destination)
+        elif destination not in self._timers:
+            self._timers[destination] = loop.call_later(self.window, self._flush, destination)
+        
+        return await future
+    
+    def _flush(self, destination: str):
+        """Send the pending batch for a destination in the background."""
+        timer = self._timers.pop(destination, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self._pending.pop(destination, None)
+        if not batch:
+            return
+        
+        task = asyncio.create_task(self._send(destination, batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+    
+    async def _send(self, destination: str, batch: List[Tuple[str, asyncio.Future]]):
+        """Submit one batch and resolve the futures of its callers."""
+        urls = [url for url, _ in batch]
+        try:
+            async with self._semaphore:
+                results = await self.client.create_download_tasks(urls, destination)
+        except Exception as e:
+            logger.error(f"Batch submission error: {str(e)}")
+            results = [TaskResult(False) for _ in batch]
+        
+        if len(batch) > 1:
+            logger.debug(f"Submitted batch of {len(batch)} URL(s) to {destination or 'default'}")
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    async def flush(self):
+        """Send all pending batches and wait for them to complete."""
+        for destination in list(self._pending):
+            self._flush(destination)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
@@ -0,0 +1,155 @@
+"""
+Download Station task lifecycle tracking.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from synology_client import SynologyDownloadStation, task_status_name
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = frozenset({"finished", "seeding", "downloaded"})
+FAILED_STATUSES = frozenset({"error", "captcha_needed", "missing"})
+
+ACTIVE_STATUSES = frozenset({
+    "downloading", "finishing", "hash_checking", "extracting",
+    "preprocessing", "postprocessing",
+})
+
+TaskCallback = Callable[[str, str, Any], Awaitable[None]]
+
+
+class TaskTracker:
+    """
+    Follows created download tasks until they finish or fail.
+
+    All tracked task IDs are looked up with one ``get`` request per poll
+    cycle, so polling cost grows with the number of unfinished tasks rather
+    than the number of messages. The interval drops to ``min_interval``
+    while tasks are progressing and doubles up to ``max_interval`` while
+    nothing changes. With no tracked tasks the tracker sends no requests.
+    When a task reaches a final state every registered callback is called
+    with ``(task_id, status, context)``; a task that disappears from
+    Download Station is reported with the status ``"missing"``.
+    """
+
+    def __init__(self, client: SynologyDownloadStation, min_interval: float = 2.0,
+                 max_interval: float = 60.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            client: Synology client used for polling
+            min_interval: Poll interval in seconds while tasks are active
+            max_interval: Longest poll interval in seconds while tasks are idle
+        """
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+
+        self._tasks: Dict[str, Any] = {}
+        self._statuses: Dict[str, str] = {}
+        self._callbacks: List[TaskCallback] = []
+        self._interval = min_interval
+        self._wakeup = asyncio.Event()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def add_callback(self, callback: TaskCallback):
+        """Register a coroutine function called when a task reaches a final state."""
+        self._callbacks.append(callback)
+
+    def track(self, task_id: str, context: Any = None):
+        """
+        Start following a task.
+
+        Args:
+            task_id: Download Station task ID
+            context: Passed to the callbacks, e.g. the originating message
+        """
+        self._tasks[task_id] = context
+        # Poll soon if the tracker was idle or had backed off
+        if self._interval > self.min_interval or len(self._tasks) == 1:
+            self._interval = self.min_interval
+            self._wakeup.set()
+
+    def __len__(self) -> int:
+        """Return the number of tasks being followed."""
+        return len(self._tasks)
+
+    async def start(self):
+        """Start polling in the background."""
+        self._poll_task = asyncio.create_task(self._poll_loop(), name="task-tracker")
+
+    async def stop(self):
+        """Stop polling."""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+
+    async def _poll_loop(self):
+        """Poll tracked tasks with an adaptive interval."""
+        while True:
+            if not self._tasks:
+                # Idle: wait for new work instead of polling
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                progressing = await self.poll()
+            except Exception as e:
+                logger.error(f"Task polling error: {str(e)}")
+                progressing = False
+
+            if progressing:
+                self._interval = self.min_interval
+            else:
+                self._interval = min(self._interval * 2, self.max_interval)
+
+    async def poll(self) -> bool:
+        """
+        Look up every tracked task once and fire callbacks for finished ones.
+
+        Returns:
+            True if any task changed status or is actively transferring
+        """
+        if not self._tasks:
+            return False
+
+        task_ids = list(self._tasks)
+        tasks = await self.client.get_tasks(task_ids)
+        if tasks is None:
+            return False
+
+        found = {task.get("id"): task_status_name(task.get("status")) for task in tasks}
+        progressing = False
+
+        for task_id in task_ids:
+            status = found.get(task_id, "missing")
+            if self._statuses.get(task_id) != status:
+                progressing = True
+                self._statuses[task_id] = status
+            elif status in ACTIVE_STATUSES:
+                progressing = True
+
+            if status in FINISHED_STATUSES or status in FAILED_STATUSES:
+                context = self._tasks.pop(task_id, None)
+                self._statuses.pop(task_id, None)
+                await self._notify(task_id, status, context)
+
+        return progressing
+
+    async def _notify(self, task_id: str, status: str, context: Any):
+        """Call every callback for a task that reached a final state."""
+        for callback in self._callbacks:
+            try:
+                await callback(task_id, status, context)
+            except Exception as e:
+                logger.error(f"Task callback error for {task_id}: {str(e)}")
@@ -32,11 +32,11 @@ async def test_synology_connection(config: Config) -> bool:
         if login_success:
             print("✅ Successfully connected to Synology NAS")
             
-            # Test getting task list
-            tasks = await synology.get_task_list()
+            # Test getting task list; one task is enough to check access
+            tasks = await synology.get_task_list(limit=1)
             if tasks is not None:
                 print("✅ Successfully retrieved download task list")
-                print(f"   Current tasks: {len(tasks.get('tasks', []))}")
+                print(f"   Current tasks: {tasks.get('total', len(tasks.get('tasks', [])))}")
             else:
                 print("⚠️  Could not retrieve task list")
             
@@ -50,6 +50,8 @@ async def test_synology_connection(config: Config) -> bool:
     except Exception as e:
         print(f"❌ Connection error: {e}")
         return False
+    finally:
+        await synology.close()
 
 
 def main():
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for processed message tracking.
+"""
+
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dedup import ProcessedMessageTracker
+
+CHANNEL = 1
+
+
+def test_out_of_order_ids_do_not_raise_floor_past_gap():
+    tracker = ProcessedMessageTracker(window=3)
+    for message_id in (100, 10, 11, 12):
+        assert tracker.mark_processed(CHANNEL, message_id)
+
+    assert not tracker.is_processed(CHANNEL, 13)
+    assert tracker.is_processed(CHANNEL, 10)
+    assert tracker.is_processed(CHANNEL, 100)
+    assert tracker.high_water(CHANNEL) == 100
+
+
+def test_catch_up_interleaved_with_live_messages():
+    # After a restart live messages arrive while catch-up feeds older ones in order
+    tracker = ProcessedMessageTracker(window=16)
+    live = iter(range(1_000_000, 1_000_100))
+    tracker.mark_processed(CHANNEL, next(live))
+
+    for message_id in range(1000, 2000):
+        assert not tracker.is_processed(CHANNEL, message_id), message_id
+        assert tracker.mark_processed(CHANNEL, message_id)
+        if message_id % 100 == 0:
+            assert tracker.mark_processed(CHANNEL, next(live))
+
+    for message_id in range(1000, 2000):
+        assert tracker.is_processed(CHANNEL, message_id)
+    assert not tracker.mark_processed(CHANNEL, 1_000_000)
+    assert len(tracker) == 16
+
+
+def test_duplicates_are_reported():
+    tracker = ProcessedMessageTracker(window=2)
+    assert tracker.mark_processed(CHANNEL, 5)
+    assert not tracker.mark_processed(CHANNEL, 5)
+    assert tracker.mark_processed(CHANNEL, 3)
+    assert tracker.mark_processed(CHANNEL, 7)
+    assert not tracker.mark_processed(CHANNEL, 3)
+    assert not tracker.is_processed(CHANNEL, 4)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the reaction scheduler.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from reactions import (ReactionScheduler, STATUS_ERROR, STATUS_FAILED, STATUS_QUEUED,
+                       STATUS_SPOOLED)
+
+CHANNEL = 1
+MESSAGE = 10
+
+
+class FakeMessage:
+    """Records the reactions on one message."""
+
+    def __init__(self):
+        self.reactions = set()
+        self.calls = []
+        self.failures = 0
+
+    async def add(self, channel_id, message_id, emoji):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("rejected")
+        self.calls.append(("add", emoji))
+        self.reactions.add(emoji)
+
+    async def remove(self, channel_id, message_id, emoji):
+        self.calls.append(("remove", emoji))
+        self.reactions.discard(emoji)
+
+
+def run(statuses):
+    """Report each batch of statuses after the previous batch was sent."""
+    message = FakeMessage()
+
+    async def main():
+        scheduler = ReactionScheduler(message.add, interval=0, remove=message.remove)
+        for batch in statuses:
+            for emoji in batch:
+                scheduler.set_status(CHANNEL, MESSAGE, emoji)
+            await scheduler.close()
+        return scheduler
+
+    return message, asyncio.run(main())
+
+
+def test_applied_failure_is_not_replaced_by_later_success():
+    # One URL spooled and one rejected shows ❌; the spooled one then succeeds
+    message, _ = run([[STATUS_SPOOLED, STATUS_FAILED], [STATUS_QUEUED]])
+    assert message.reactions == {STATUS_FAILED}
+    assert ("remove", STATUS_FAILED) not in message.calls
+
+
+def test_spooled_replays_fail_then_succeed():
+    message, _ = run([[STATUS_SPOOLED], [STATUS_FAILED], [STATUS_QUEUED]])
+    assert message.reactions == {STATUS_FAILED}
+
+
+def test_spooled_is_replaced_by_final_status():
+    message, scheduler = run([[STATUS_SPOOLED], [STATUS_QUEUED]])
+    assert message.reactions == {STATUS_QUEUED}
+    assert scheduler.removed == 1
+
+
+def test_failed_send_is_merged_with_status_reported_meanwhile():
+    message = FakeMessage()
+    attempts = []
+
+    async def main():
+        async def add(channel_id, message_id, emoji):
+            attempts.append(emoji)
+            if len(attempts) == 1:
+                message.failures = 1
+                # A success for another URL arrives while the ⚠️ is being sent
+                scheduler.set_status(CHANNEL, MESSAGE, STATUS_QUEUED)
+            await message.add(channel_id, message_id, emoji)
+
+        scheduler = ReactionScheduler(add, interval=0, remove=message.remove)
+        scheduler.set_status(CHANNEL, MESSAGE, STATUS_ERROR)
+        await scheduler.close()
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert message.reactions == {STATUS_ERROR}
+    assert scheduler.failed == 0